@@ -1,72 +1,61 @@
+import argparse
 import logging
 import os
+import sys
 
-from flask import Flask, request
 
-from battle_snake.interactor import MoveDecision, get_info
+def run_production_server():
+    """Pre-forking multi-worker server (gunicorn), see gunicorn_config."""
+    from gunicorn.app.wsgiapp import run
 
-app = Flask(__name__)
+    sys.argv = [
+        "gunicorn",
+        "--config",
+        "python:battle_snake.gunicorn_config",
+        "battle_snake.server:app",
+    ]
+    run()
 
 
-@app.get("/")
-def handle_info():
-    """
-    This function is called when you register your Battlesnake on play.battlesnake.com
-    See https://docs.battlesnake.com/guides/getting-started#step-4-register-your-battlesnake
-    """
-    print("INFO")
-    return get_info()
-
-
-@app.post("/start")
-def handle_start():
-    """
-    This function is called everytime your Battlesnake enters a game.
-    It's purely for informational purposes, you don't have to make any decisions here.
-    request.json contains information about the game that's about to be played.
-    """
-    data: dict = request.get_json()  # type: ignore
-
-    print(f"{data['game']['id']} START")
-    return "ok"
-
-
-@app.post("/move")
-def handle_move():
-    """
-    This function is called on every turn and is how your Battlesnake decides where to move.
-    Valid moves are "up", "down", "left", or "right".
-    """
-    data = request.get_json()
-    move_decision = MoveDecision(data)  # type: ignore
-
-    return {"move": move_decision.decide().value}
-
-
-@app.post("/end")
-def handle_end():
-    """
-    This function is called when a game your Battlesnake was in has ended.
-    It's purely for informational purposes, you don't have to make any decisions here.
-    """
-    data = request.get_json()
-
-    print(f"{data['game']['id']} END")  # type: ignore
-    return "ok"
+def run_asgi_server():
+    """Asynchronous server (uvicorn), see asgi."""
+    import uvicorn
 
+    port = int(os.environ.get("PORT", "8080"))
+    uvicorn.run("battle_snake.asgi:app", host="0.0.0.0", port=port, log_level="warning")
 
-@app.after_request
-def identify_server(response):
-    response.headers["Server"] = "BattlesnakeOfficial/starter-snake-python"
-    return response
 
+def run_development_server():
+    """Flask development server with reloader and debugger - never in production!"""
+    from battle_snake.server import app, init_simulation_pool
 
-if __name__ == "__main__":
     logging.getLogger("werkzeug").setLevel(logging.ERROR)
 
     host = "0.0.0.0"
     port = int(os.environ.get("PORT", "8080"))
+    init_simulation_pool()
 
-    print(f"\nRunning Battlesnake server at http://{host}:{port}")
+    print(f"\nRunning Battlesnake development server at http://{host}:{port}")
     app.env = "development"
     app.run(host=host, port=port, debug=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the Battlesnake server.")
+    parser.add_argument(
+        "--dev",
+        action="store_true",
+        help="run the Flask development server (debugger, reloader, single process)",
+    )
+    parser.add_argument(
+        "--asgi",
+        action="store_true",
+        help="run the asynchronous server (uvicorn), moves are decided in a process pool",
+    )
+    args = parser.parse_args()
+    if args.dev:
+        run_development_server()
+    elif args.asgi:
+        run_asgi_server()
+    else:
+        run_production_server()
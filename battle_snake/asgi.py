@@ -0,0 +1,160 @@
+"""Asynchronous (ASGI) variant of the Battlesnake server.
+
+    uvicorn battle_snake.asgi:app
+
+The event loop only handles the HTTP requests. The decisions for /move are made
+by a pool of processes, so a slow simulation of one game doesn't delay the
+requests of other games.
+
+Environment variables:
+    MOVE_WORKERS: Processes making decisions (default: amount of CPUs).
+    MAX_PENDING_MOVES: Moves being decided or waiting for a process at the
+        same time (default: 2 * MOVE_WORKERS). Further moves wait for a free place.
+"""
+import asyncio
+import json
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from battle_snake.interactor import (
+    DEFAULT_TIMEOUT_MS,
+    TIMEOUT_RESERVE_MS,
+    MoveDecision,
+    get_info,
+)
+from battle_snake.request_parser import loads
+
+# Part of the timeout reserved for sending the response back (ms)
+RESPONSE_RESERVE_MS = 50
+
+
+def decide_move(game_request: dict, simulation_deadline: float) -> str:
+    """Decision for the next move, simulating until the deadline (time.time()).
+
+    Runs within a process of the pool."""
+    time_budget = max(int((simulation_deadline - time.time()) * 1e9), 0)
+    return MoveDecision(game_request, time_budget=time_budget).decide().value
+
+
+class BattlesnakeApp:
+    """ASGI application with the same routes as the Flask app (server.py).
+
+    Every move has a deadline given by the timeout of the game. If no decision
+    has been made until then (e.g. all processes are busy), waiting for it is
+    cancelled and a decision based on the first turn only is sent instead
+    (made in a thread, not within the event loop).
+    """
+
+    def __init__(self, move_workers: int, max_pending_moves: int):
+        self._move_workers = move_workers
+        self._max_pending_moves = max_pending_moves
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pending_moves: Optional[asyncio.Semaphore] = None
+
+    async def __call__(self, scope: dict, receive, send):
+        if scope["type"] == "lifespan":
+            await self._handle_lifespan(receive, send)
+        elif scope["type"] == "http":
+            await self._handle_http(scope, receive, send)
+
+    def start(self):
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self._move_workers)
+            self._pending_moves = asyncio.Semaphore(self._max_pending_moves)
+
+    def stop(self):
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+    async def _handle_lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                self.start()
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                self.stop()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def _handle_http(self, scope: dict, receive, send):
+        route = (scope["method"], scope["path"])
+        if route == ("GET", "/"):
+            await self._send_json(send, get_info())
+            return
+        if route not in {("POST", "/start"), ("POST", "/move"), ("POST", "/end")}:
+            await self._send(send, 404, b"not found", b"text/plain")
+            return
+        try:
+            data: dict = loads(await self._read_body(receive))
+        except ValueError:
+            await self._send(send, 400, b"invalid json", b"text/plain")
+            return
+        if route == ("POST", "/move"):
+            await self._send_json(send, {"move": await self.decide_move(data)})
+            return
+        event = "START" if route == ("POST", "/start") else "END"
+        print(f"{data['game']['id']} {event}")
+        await self._send(send, 200, b"ok", b"text/html; charset=utf-8")
+
+    async def decide_move(self, game_request: dict) -> str:
+        self.start()
+        timeout_ms = game_request.get("game", {}).get("timeout", DEFAULT_TIMEOUT_MS)
+        arrival = time.time()
+        simulation_deadline = arrival + (timeout_ms - TIMEOUT_RESERVE_MS) / 1000
+        response_deadline = arrival + (timeout_ms - RESPONSE_RESERVE_MS) / 1000
+        try:
+            return await asyncio.wait_for(
+                self._decide_move_in_pool(game_request, simulation_deadline),
+                timeout=response_deadline - time.time(),
+            )
+        except asyncio.TimeoutError:
+            logging.info("No decision before the deadline, deciding on first turn")
+            # In a thread, so the requests of the other games aren't blocked
+            return await asyncio.get_running_loop().run_in_executor(
+                None, decide_move, game_request, 0
+            )
+
+    async def _decide_move_in_pool(
+        self, game_request: dict, simulation_deadline: float
+    ) -> str:
+        async with self._pending_moves:  # type: ignore
+            return await asyncio.get_running_loop().run_in_executor(
+                self._pool, decide_move, game_request, simulation_deadline
+            )
+
+    async def _read_body(self, receive) -> bytes:
+        body = b""
+        more_body = True
+        while more_body:
+            message = await receive()
+            body += message.get("body", b"")
+            more_body = message.get("more_body", False)
+        return body
+
+    async def _send_json(self, send, data: dict):
+        await self._send(send, 200, json.dumps(data).encode(), b"application/json")
+
+    async def _send(self, send, status: int, body: bytes, content_type: bytes):
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status,
+                "headers": [
+                    (b"content-type", content_type),
+                    (b"server", b"BattlesnakeOfficial/starter-snake-python"),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
+
+
+_move_workers = int(os.environ.get("MOVE_WORKERS", os.cpu_count() or 1))
+app = BattlesnakeApp(
+    move_workers=_move_workers,
+    max_pending_moves=int(os.environ.get("MAX_PENDING_MOVES", 2 * _move_workers)),
+)
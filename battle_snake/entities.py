@@ -1,8 +1,10 @@
-from collections import defaultdict, deque
+from abc import ABC, abstractmethod
+from collections import defaultdict
 from dataclasses import dataclass
 from enum import Enum
-from itertools import islice
-from typing import Iterable, NewType, Optional, Protocol
+from functools import cache
+from itertools import chain, islice
+from typing import Iterable, Iterator, NamedTuple, NewType, Optional, Protocol
 
 
 class NextStep(Enum):
@@ -15,6 +17,9 @@ class NextStep(Enum):
 AmountOfSteps = NewType("AmountOfSteps", int)
 AmountOfSnakesAlive = NewType("AmountOfSnakesAlive", int)
 FirstStep = NewType("FirstStep", NextStep)
+StateKey = tuple
+# Immutable linked list of positions: (position, rest of the list) or None
+BodyPath = Optional[tuple]
 
 
 @dataclass(frozen=True, slots=True)
@@ -27,34 +32,132 @@ class Snake:
     """Representation of one single snake.
 
     If the snake is myself it's marked with is_me flag.
+
+    The body is stored in a way that can be shared with all future snakes
+    derived from this snake: The original body is an immutable tuple,
+    the heads added by future steps are an immutable linked list (newest first)
+    and the length tells how much of both belongs to the snake.
+    The cells occupied by the body are kept in a bitmask with the numbering of the
+    bounderies (see GameBoardBounderies.cell_bit). Snakes created without
+    bounderies are on a standard board until they're placed on another board.
+
+    Snakes are created by the hundred thousand per move, so there's no instance
+    dictionary (slots only).
     """
 
-    def __init__(self, head_and_body: list[Position], is_me=False):
-        self._head_and_body: deque[Position] = deque(head_and_body)
+    __slots__ = (
+        "_origin",
+        "_path",
+        "_steps",
+        "_length",
+        "is_me",
+        "id",
+        "multiplicity",
+        "_occupied",
+        "_occupied_without_tail",
+        "_bounderies",
+        "__weakref__",
+    )
+
+    def __init__(
+        self,
+        head_and_body: list[Position],
+        is_me=False,
+        bounderies: Optional["GameBoardBounderies"] = None,
+    ):
+        self._origin: tuple[Position, ...] = tuple(head_and_body)
+        self._path: BodyPath = None
+        self._steps: int = 0
+        self._length: int = len(self._origin)
         self.is_me: bool = is_me
-        self.id = self._head_and_body[0]
+        self.id = self._origin[0]
+        self.multiplicity: int = 1
+        self._bounderies: GameBoardBounderies = bounderies or STANDARD_BOUNDERIES
+        self._occupied: int = self._calculate_occupied()
+        self._occupied_without_tail: Optional[int] = None
 
     @classmethod
-    def from_dict(cls, **snake_data: dict) -> "Snake":
+    def from_dict(
+        cls, bounderies: Optional["GameBoardBounderies"] = None, **snake_data: dict
+    ) -> "Snake":
+        """Create snake from request data.
+
+        Positions are taken from the bounderies, if given (one Position per cell)."""
+        make_position = bounderies.get_position if bounderies else Position
         head_and_body: list[Position] = [
-            Position(**position) for position in snake_data["body"]
+            make_position(**position) for position in snake_data["body"]
         ]
-        return cls(head_and_body)
+        return cls(head_and_body, bounderies=bounderies)
 
     @property
     def head_and_body(self) -> list[Position]:
-        return list(self._head_and_body)
+        return list(self._iter_head_and_body())
 
     @property
     def head(self) -> Position:
-        return self._head_and_body[0]
+        if self._path is None:
+            return self._origin[0]
+        return self._path[0]
 
     @property
     def body_without_head(self) -> list[Position]:
-        return list(islice(self._head_and_body, 1, None))
+        return list(islice(self._iter_head_and_body(), 1, None))
+
+    @property
+    def tail(self) -> Position:
+        return self._get_cell(self._length - 1)
+
+    def is_tail_stacked(self) -> bool:
+        """Is the tail covered by another part of the body (e.g. after eating)?"""
+        return self._length > 1 and self._get_cell(self._length - 2) == self.tail
+
+    def place_on(self, bounderies: "GameBoardBounderies"):
+        """Number the occupied cells like the bounderies of the board of the snake."""
+        if self._bounderies != bounderies:
+            self._bounderies = bounderies
+            self._occupied = self._calculate_occupied()
+            self._occupied_without_tail = None
+
+    def _calculate_occupied(self) -> int:
+        occupied = 0
+        for pos in self._iter_head_and_body():
+            occupied |= self._get_bit(pos)
+        return occupied
+
+    def _get_bit(self, pos: Position) -> int:
+        # Cells outside of the board (e.g. a head in the wall) occupy nothing
+        if self._bounderies.is_wall(pos):
+            return 0
+        return self._bounderies.cell_bit(pos)
+
+    def _get_occupied_without_tail(self) -> int:
+        """Occupancy mask after the tail moved on (once per snake, for all babies).
+
+        A stacked tail (e.g. at the start of the game) keeps its cell occupied."""
+        if self._occupied_without_tail is None:
+            self._occupied_without_tail = self._occupied
+            if not self.is_tail_stacked():
+                self._occupied_without_tail &= ~self._get_bit(self.tail)
+        return self._occupied_without_tail
+
+    def _iter_path(self) -> Iterator[Position]:
+        node = self._path
+        while node is not None:
+            yield node[0]
+            node = node[1]
+
+    def _iter_head_and_body(self) -> Iterator[Position]:
+        cells_of_path = min(self._steps, self._length)
+        yield from islice(self._iter_path(), cells_of_path)
+        yield from islice(self._origin, self._length - cells_of_path)
+
+    def _get_cell(self, index: int) -> Position:
+        if index >= self._steps:
+            return self._origin[index - self._steps]
+        return next(islice(self._iter_path(), index, None))
 
     def __len__(self):
-        return len(self._head_and_body)
+        return self._length
 
     def __str__(self):
         return SnakeVisualizer(self).snake_in_11x11_board
@@ -63,10 +166,12 @@ class Snake:
         self,
         next_step: NextStep,
         is_food_available: bool = False,
+        future_head: Optional[Position] = None,
+        keep_mother: bool = True,
     ) -> "FutureSnake":
         """Return a new theoretical posibble snake based on the next step and available food."""
 
-        return FutureSnake(self, next_step, is_food_available)
+        return FutureSnake(self, next_step, is_food_available, future_head, keep_mother)
 
     def bites_itself(self) -> bool:
         return self.head in self.body_without_head
@@ -89,43 +194,85 @@ class FutureSnake(Snake):
     A FutureSnake can calculate another FutureSnake. Every FutureSnake can
     go back to the very first next_step of the earliest ancestor.
 
+    Everything needed from the mother is taken over at creation time, so the
+    mother isn't needed afterwards. Without keep_mother it's not referenced at all
+    and every generation of ancestors can be freed as soon as it's not used anymore.
+
+    The occupancy mask is taken over from the mother and updated by the new head
+    and the vacated tail, so biting itself is known without looking at the body.
+
+    Several paths may lead to exactly the same snake. The PossibleFutureBoard keeps
+    only one of them and counts in 'multiplicity' how many paths it stands for.
+
     Args:
         next_step (NextStep): Direction for the next step.
         is_food_available (bool, optional): Is there currenlty food beneath the
             snake's head? Defaults to False.
+        future_head (Position, optional): Head after the next step, if it's already
+            known (e.g. from the MoveTable). Calculated if not given.
+        keep_mother (bool, optional): Keep a reference to the mother. Defaults to True.
 
     Returns:
         FutureSnake: Brand new 'theoretical' snake how it would look like in the future after the next step."""
 
+    __slots__ = (
+        "mother",
+        "step_made_to_get_here",
+        "my_first_step",
+        "_is_food_available_at_creation_time",
+        "_is_biting_itself",
+    )
+
     def __init__(
         self,
         mother,
         next_step: NextStep,
         is_food_available: bool,
+        future_head: Optional[Position] = None,
+        keep_mother: bool = True,
     ):
-        self.mother: Snake | FutureSnake = mother
-        self._head_and_body = mother._head_and_body.copy()
+        self.mother: Optional[Snake | FutureSnake] = mother if keep_mother else None
+        self._origin = mother._origin
+        self._path = mother._path
+        self._steps = mother._steps
+        self._length = mother._length
+        self._occupied = mother._occupied
+        self._occupied_without_tail = None
+        self._bounderies = mother._bounderies
         self.step_made_to_get_here = next_step
         if type(mother) == Snake:
             self.my_first_step = next_step
         elif type(mother) == FutureSnake:
             self.my_first_step = mother.my_first_step  # type: ignore
         self.is_me = mother.is_me
+        self.multiplicity: int = mother.multiplicity
         self._is_food_available_at_creation_time = is_food_available
-        self._calculate_future_body()
+        self._calculate_future_body(mother, future_head)
         # One ID is the same for all possible-future-snakes that is based on one "normal" Snake
         self.id = mother.id
 
-    def _calculate_future_body(self):
-        self._add_future_head_to_future_snake()
+    def _calculate_future_body(self, mother: Snake, future_head: Optional[Position]):
+        # The length is still the length of the mother
         if self._is_still_baby_snake():
             self._is_food_available_at_creation_time = True
+        # The tail is vacated before the head enters (biting the tail is allowed)
         if not self._is_food_available_at_creation_time:
-            self._remove_tail()
+            self._remove_tail(mother)
+        self._add_future_head_to_future_snake(future_head)
 
-    def _add_future_head_to_future_snake(self):
-        future_head_position: Position = self._calc_future_head_position()
-        self._head_and_body.appendleft(future_head_position)
+    def _add_future_head_to_future_snake(self, future_head: Optional[Position]):
+        if future_head is None:
+            future_head_position = self._calc_future_head_position()
+            head_bit = self._get_bit(future_head_position)
+        else:
+            # Heads given by the MoveTable are always within the bounderies
+            future_head_position = future_head
+            head_bit = self._bounderies.cell_bit(future_head_position)
+        self._is_biting_itself = bool(self._occupied & head_bit)
+        self._occupied |= head_bit
+        self._path = (future_head_position, self._path)
+        self._steps += 1
+        self._length += 1
 
     def _calc_future_head_position(self) -> Position:
         if self.step_made_to_get_here == NextStep.UP:
@@ -140,17 +287,87 @@ class FutureSnake(Snake):
             raise ValueError(f"Next step not defined: {self.step_made_to_get_here}")
 
     def _is_still_baby_snake(self):
-        return len(self.mother) < 3
+        return self._length < 3
+
+    def _remove_tail(self, mother: Snake):
+        self._occupied = mother._get_occupied_without_tail()
+        self._length -= 1
 
-    def _remove_tail(self):
-        self._head_and_body.pop()
+    def bites_itself(self) -> bool:
+        return self._is_biting_itself
 
     def get_my_first_step(self) -> NextStep:
         """Get the first step from the first FutureSnake in this line of relatives"""
         return self.my_first_step
 
+    def get_path(self) -> list[Position]:
+        """Heads after all steps made since the original snake, first step first."""
+        return list(islice(self._iter_path(), self._steps))[::-1]
+
+    def rebase_on(self, snake: Snake) -> Optional["FutureSnake"]:
+        """Same variant, as if it was derived from the snake one turn later.
+
+        The snake is the original snake of this variant after its first step.
+        None, if the snake didn't make the first step of this variant (or didn't
+        grow like it). The variant has to be at least two steps away from its
+        original snake."""
+        path = self.get_path()[::-1]  # newest first, the first step last
+        head_and_body = self.head_and_body
+        if (
+            path[-1] != snake.head
+            or head_and_body != (path[:-1] + snake.head_and_body)[: self._length]
+        ):
+            return None
+        variant = FutureSnake.__new__(FutureSnake)
+        variant.mother = None
+        variant._origin = snake._origin
+        variant._path = None
+        for pos in reversed(path[:-1]):
+            variant._path = (pos, variant._path)
+        variant._steps = self._steps - 1
+        variant._length = self._length
+        variant._bounderies = snake._bounderies
+        variant._occupied = variant._calculate_occupied()
+        variant._occupied_without_tail = None
+        variant.step_made_to_get_here = self.step_made_to_get_here
+        variant.my_first_step = _get_step(snake.head, path[-2])
+        variant.is_me = snake.is_me
+        variant.multiplicity = self.multiplicity
+        variant._is_food_available_at_creation_time = (
+            self._is_food_available_at_creation_time
+        )
+        variant._is_biting_itself = False
+        variant.id = snake.id
+        return variant
+
+    @property
+    def state_key(self) -> StateKey:
+        """Key that is equal for all variants that can't be told apart by the simulation.
+
+        The first step is only relevant for my own snake, because the first steps
+        of the other snakes are never evaluated."""
+        first_step = self.my_first_step if self.is_me else None
+        # The part of the original body is defined by the length already,
+        # because all variants on a board made the same amount of steps.
+        cells_of_path = tuple(islice(self._iter_path(), min(self._steps, self._length)))
+        return (self.id, first_step, self._length, cells_of_path)
+
     def __repr__(self) -> str:
-        return f"FutureSnake: ID={self.id}, HEAD={self.head}, MOTHER={self.mother.head}"
+        # The head of the mother is the second cell of every future snake
+        return (
+            f"FutureSnake: ID={self.id}, HEAD={self.head}, MOTHER={self._get_cell(1)}"
+        )
+
+
+def _get_step(from_pos: Position, to_pos: Position) -> NextStep:
+    """Step between two neighboring positions."""
+    if to_pos.x > from_pos.x:
+        return NextStep.RIGHT
+    if to_pos.x < from_pos.x:
+        return NextStep.LEFT
+    if to_pos.y > from_pos.y:
+        return NextStep.UP
+    return NextStep.DOWN
 
 
 class SnakeVisualizer:
@@ -204,15 +421,23 @@ class Board:
         self.bounderies: "GameBoardBounderies" = bounderies
         self.food: set[Position] = food
         self.snakes: set[Snake] = snakes
+        for snake in self.snakes:
+            snake.place_on(bounderies)
         self._my_snake: Snake = [snake for snake in self.snakes if snake.is_me][0]
 
     @classmethod
     def from_dict(cls, game_request: dict) -> "Board":
         board_data: dict = game_request["board"]
-        my_head_pos = Position(**game_request["you"]["head"])
         bounderies = GameBoardBounderies(board_data["height"], board_data["width"])
-        food = {Position(**position_data) for position_data in board_data["food"]}
-        snakes = {Snake.from_dict(**snake_data) for snake_data in board_data["snakes"]}
+        my_head_pos = bounderies.get_position(**game_request["you"]["head"])
+        food = {
+            bounderies.get_position(**position_data)
+            for position_data in board_data["food"]
+        }
+        snakes = {
+            Snake.from_dict(bounderies, **snake_data)
+            for snake_data in board_data["snakes"]
+        }
         my_snake = [snake for snake in snakes if snake.head == my_head_pos].pop()
         my_snake.is_me = True
         return cls(bounderies, food, snakes)
@@ -266,6 +491,9 @@ class Board:
 
     def move_snake(self, snake: Snake, next_step: NextStep) -> Position:
         """Get new head position of snake afer moving into given direction."""
+        new_head = self.bounderies.get_position_after_step(snake.head, next_step)
+        if new_head is not None:
+            return new_head
         x, y = snake.head.x, snake.head.y
         match next_step:
             case NextStep.UP:
@@ -278,10 +506,122 @@ class Board:
                 return Position(x + 1, y)
 
 
+OFF_BOARD = -1
+
+
+class Move(NamedTuple):
+    step: NextStep
+    cell: int
+    position: Position
+
+
+class MoveTable:
+    """Neighbors of all cells of a board of a certain size.
+
+    Cells are numbered by y * width + x. For every cell and direction 'neighbors'
+    contains the number of the neighboring cell or OFF_BOARD, if the step leads
+    into a wall. 'moves' contains all steps from a cell that stay on the board.
+
+    'positions' contains the one and only Position of every cell (flyweights),
+    that is used for this board size, so positions don't have to be created
+    again and again and are mostly compared by identity.
+    """
+
+    def __init__(self, width: int, height: int):
+        self.width = width
+        self.height = height
+        self.positions: list[Position] = [
+            Position(x, y) for y in range(height) for x in range(width)
+        ]
+        self.neighbors: list[dict[NextStep, int]] = [
+            {step: self._calc_neighbor(pos, step) for step in NextStep}
+            for pos in self.positions
+        ]
+        self.moves: list[tuple[Move, ...]] = [
+            self._collect_moves(neighbors_of_cell)
+            for neighbors_of_cell in self.neighbors
+        ]
+
+    def get_position(self, x: int, y: int) -> Position:
+        """Canonical position of the cell (a new one for positions off the board)."""
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return self.positions[y * self.width + x]
+        return Position(x, y)
+
+    def _calc_neighbor(self, pos: Position, step: NextStep) -> int:
+        x, y = pos.x, pos.y
+        match step:
+            case NextStep.UP:
+                y += 1
+            case NextStep.DOWN:
+                y -= 1
+            case NextStep.LEFT:
+                x -= 1
+            case NextStep.RIGHT:
+                x += 1
+        if x < 0 or y < 0 or x >= self.width or y >= self.height:
+            return OFF_BOARD
+        return y * self.width + x
+
+    def _collect_moves(
+        self, neighbors_of_cell: dict[NextStep, int]
+    ) -> tuple[Move, ...]:
+        return tuple(
+            Move(step, cell, self.positions[cell])
+            for step, cell in neighbors_of_cell.items()
+            if cell != OFF_BOARD
+        )
+
+
+@cache
+def get_move_table(width: int, height: int) -> MoveTable:
+    """MoveTable for the board size, built only once per size."""
+    return MoveTable(width, height)
+
+
 class GameBoardBounderies:
     def __init__(self, height: int, width: int):
         self.height = height
         self.width = width
+        self.move_table: MoveTable = get_move_table(width, height)
+
+    def get_position(self, x: int, y: int) -> Position:
+        return self.move_table.get_position(x, y)
+
+    def cell_index(self, pos: Position) -> int:
+        """Number of the cell of the position (y * width + x).
+
+        Only valid for positions within the bounderies."""
+        return pos.y * self.width + pos.x
+
+    def cell_bit(self, pos: Position) -> int:
+        """Bit of the position within a bitboard (bit index: y * width + x).
+
+        Only valid for positions within the bounderies."""
+        return 1 << self.cell_index(pos)
+
+    def get_moves(self, pos: Position) -> tuple[Move, ...]:
+        """All steps from the position that don't lead into a wall."""
+        if self.is_wall(pos):
+            return ()
+        return self.move_table.moves[self.cell_index(pos)]
+
+    def get_position_after_step(
+        self, pos: Position, step: NextStep
+    ) -> Optional[Position]:
+        """Position after the step or None if the step leads into a wall."""
+        if self.is_wall(pos):
+            return None
+        cell = self.move_table.neighbors[self.cell_index(pos)][step]
+        if cell == OFF_BOARD:
+            return None
+        return self.move_table.positions[cell]
+
+    def cells_mask(self, positions: Iterable[Position]) -> int:
+        mask = 0
+        for pos in positions:
+            mask |= self.cell_bit(pos)
+        return mask
 
     def is_wall(self, pos: Position) -> bool:
         if pos.x < 0 or pos.y < 0:
@@ -296,14 +636,83 @@ class GameBoardBounderies:
         return self.height == other.height and self.width == other.width
 
 
+# Size of the board of the standard game mode
+STANDARD_BOUNDERIES = GameBoardBounderies(11, 11)
+
+
 class Recorder(Protocol):
-    """Record history of all information of interest of the PossibleFutureBoard"""
+    """Record history of all information of interest of the FutureBoard"""
+
+    def save(self, board: "FutureBoard"):
+        ...
+
+
+class FutureBoard(ABC):
+    """Interface of the engines simulating the future board (see MoveDecision).
+
+    The variants of the snakes offered by an engine are FutureSnake objects or
+    at least offer the part of their interface used by the recorder.
+    """
+
+    # The simulation can be resumed with variants of a later turn (see resume)
+    can_resume: bool = False
+    # Don't merge variants with different first two steps, so every variant
+    # stands for paths of one first step of all snakes and one second step
+    # (needed to resume the simulation one turn later, see FutureSnake.rebase_on).
+    keep_first_steps_apart: bool = False
+
+    bounderies: GameBoardBounderies
+    food: set[Position]
+    pruned_variants_per_turn: list[int]
+    recorder: Optional[Recorder]
+    simulated_turns: int
+
+    def is_wall(self, pos: Position) -> bool:
+        return self.bounderies.is_wall(pos)
+
+    def register_recorder(self, recorder: Recorder):
+        self.recorder = recorder
+        self.recorder.save(self)
+
+    @property
+    @abstractmethod
+    def possible_snakes(self) -> set:
+        """Variants of all snakes (a new set)."""
 
-    def save(self, board: "PossibleFutureBoard"):
+    @abstractmethod
+    def get_my_survived_snakes(self) -> set:
+        """Variants of my snake."""
+
+    @abstractmethod
+    def get_variants_of_other_snakes(self) -> Iterator:
+        """Variants of all snakes except mine."""
+
+    @abstractmethod
+    def count_my_survived_snakes(self) -> int:
+        """Count all paths of my snake, including the merged ones."""
+
+    @abstractmethod
+    def count_variants(self) -> int:
+        """Count variants of all snakes on the board (merged ones count once)."""
+
+    @abstractmethod
+    def next_turn(self) -> None:
+        """Simulate the next turn (and save it to the recorder)."""
+
+    @abstractmethod
+    def is_food_available_for(self, snake) -> bool:
+        ...
+
+    @abstractmethod
+    def does_my_snake_bite_or_collide_with_another_snake(self, my_snake) -> bool:
         ...
 
+    def resume(self, variants: Iterable["FutureSnake"], simulated_turns: int):
+        """Continue with the variants of a later turn (if can_resume)."""
+        raise NotImplementedError(f"{type(self).__name__} can't resume")
+
 
-class PossibleFutureBoard:
+class PossibleFutureBoard(FutureBoard):
     """Simulate Board as it could look like in the future.
 
     Add all possible future snakes for every new step.
@@ -315,23 +724,90 @@ class PossibleFutureBoard:
 
     Remove eaten food after calculating the next_turn.
 
+    Variants of a snake reaching exactly the same body via different paths
+    are merged into one (transposition table). The merged variant counts
+    the paths it represents in its multiplicity.
+
     Several turns can be simulated using next_turn.
     For performance reasons it's possible to register a recorder
     to evaluate interesting information later on.
+
+    If my_first_steps are given, only these first steps of my snake are simulated
+    (e.g. to simulate the first steps in parallel).
+
+    If max_variants_per_snake is given, only that many variants of every other
+    snake are kept per turn: the ones nearest to (the original head of) my snake,
+    the ones representing more paths first. My own variants are never pruned.
+    The amount of pruned variants per turn is kept in pruned_variants_per_turn.
+
+    The variants are kept partitioned by snake id, so the variants of my snake
+    (or of the other snakes) are found without scanning all (possible_snakes).
+    For collision checks of my variants the cells of the other snakes are indexed
+    once per turn (when needed).
     """
 
-    def __init__(self, board: Board):
+    # Keep the mother of every variant (the whole ancestry, e.g. for debugging).
+    # Otherwise a generation of variants is freed after the next turn.
+    keep_ancestors: bool = False
+    can_resume: bool = True
+
+    def __init__(
+        self,
+        board: Board,
+        my_first_steps: Optional[set[NextStep]] = None,
+        max_variants_per_snake: Optional[int] = None,
+    ):
         self.bounderies: GameBoardBounderies = board.bounderies
+        self._my_first_steps: Optional[set[NextStep]] = my_first_steps
+        self._max_variants_per_snake = max_variants_per_snake
+        self._my_head: Position = board.my_snake.head
+        self._my_snake_id: Position = board.my_snake.id
+        self.pruned_variants_per_turn: list[int] = []
         self.food: set[Position] = board.food.copy()
-        self.possible_snakes: set[FutureSnake] = set()
+        self._variants_by_id: dict[Position, set[FutureSnake]] = defaultdict(set)
+        self._transpositions: dict[StateKey, FutureSnake] = dict()
+        # Per cell: ids of other snakes with a body there / longest head there
+        self._other_bodies: Optional[dict[Position, set[Position]]] = None
+        self._longest_other_heads: Optional[dict[Position, int]] = None
         self.recorder: Optional[Recorder] = None
         self.simulated_turns: int = 1
+        self._original_lengths: dict[Position, int] = {
+            snake.id: len(snake) for snake in board.snakes
+        }
+        # Built when needed (engines with their own collision check don't)
+        self._original_snakes: list[Snake] = list(board.snakes)
+        self._vacating_turns: Optional[list[tuple[tuple[Position, int], ...]]] = None
         self._prepare_future_board(board.snakes)
 
+    def _get_vacating_turns(
+        self, snakes: Iterable[Snake]
+    ) -> list[tuple[tuple[Position, int], ...]]:
+        """Per cell: the snakes on it and the turn they vacate it without eating.
+
+        The tail is vacated after one turn, the head after len(snake) turns.
+        Every food eaten by a snake delays this by one turn."""
+        vacating_turns: list[dict[Position, int]] = [
+            dict() for _ in range(self.bounderies.width * self.bounderies.height)
+        ]
+        for snake in snakes:
+            length = len(snake)
+            for index, pos in enumerate(snake.head_and_body):
+                if self.bounderies.is_wall(pos):
+                    continue
+                turns = vacating_turns[self.bounderies.cell_index(pos)]
+                turns[snake.id] = max(turns.get(snake.id, 0), length - index)
+        return [tuple(turns.items()) for turns in vacating_turns]
+
     def _prepare_future_board(self, orig_snakes: Iterable[Snake]):
-        self.possible_snakes = set()
+        self._variants_by_id = defaultdict(set)
+        self._transpositions = dict()
+        self._other_bodies = None
+        self._longest_other_heads = None
         self._add_possible_snakes_of_future(orig_snakes)
+        self._transpositions = dict()  # needed while adding variants only
         self._remove_snakes_biting_other_snakes()
+        if self._max_variants_per_snake is not None:
+            self._prune_variants_of_other_snakes(self._max_variants_per_snake)
 
     def _add_possible_snakes_of_future(self, orig_snakes: Iterable[Snake]):
         for original_snake in orig_snakes:
@@ -340,43 +816,106 @@ class PossibleFutureBoard:
     def _add_possible_variants_of_one_snake_to_future_board(
         self, original_snake: Snake | FutureSnake
     ):
-        for step in NextStep:
-            future_snake = self._make_future_snake(original_snake, step)
-            if future_snake.bites_itself() or self.is_wall(future_snake.head):
+        has_food = self.is_food_available_for(original_snake)
+        for step, _, future_head in self._get_moves_of(original_snake):
+            future_snake = original_snake.calculate_future_snake(
+                step, has_food, future_head, self.keep_ancestors
+            )
+            if future_snake.bites_itself():
                 continue
-            self.possible_snakes.add(future_snake)
-
-    def _make_future_snake(
-        self, snake: Snake | FutureSnake, step: NextStep
-    ) -> FutureSnake:
-        has_food = self.is_food_available_for(snake)
-        return snake.calculate_future_snake(step, has_food)
+            self._add_or_merge_variant(future_snake)
+
+    def _get_moves_of(self, snake: Snake | FutureSnake) -> Iterable[Move]:
+        moves = self.bounderies.get_moves(snake.head)
+        if self._my_first_steps is not None and snake.is_me and type(snake) == Snake:
+            return [move for move in moves if move.step in self._my_first_steps]
+        return moves
+
+    def _add_or_merge_variant(self, future_snake: FutureSnake) -> FutureSnake:
+        """Add variant to the board and return the variant kept on the board."""
+        key = future_snake.state_key
+        if self.keep_first_steps_apart:
+            key = (key, tuple(future_snake.get_path()[:2]))
+        known_variant = self._transpositions.get(key)
+        if known_variant is None:
+            self._transpositions[key] = future_snake
+            self._variants_by_id[future_snake.id].add(future_snake)
+            return future_snake
+        known_variant.multiplicity += future_snake.multiplicity
+        return known_variant
 
     def is_food_available_for(self, snake: Snake):
         return snake.head in self.food
 
     def _remove_snakes_biting_other_snakes(self):
-        deterministik_snake_bodies = defaultdict(set)
+        """Remove variants biting the deterministic part of another snake.
+
+        The deterministic part of a snake is the part of its original body not
+        vacated yet by any of its variants: the vacating turn of the cell is
+        delayed by the growth of the longest variant. From the second step on,
+        the cell of the first step belongs to it, too (if the variant is long
+        enough to still cover it).
+        """
+        if self._vacating_turns is None:
+            self._vacating_turns = self._get_vacating_turns(self._original_snakes)
+        growth_by_id: dict[Position, int] = dict()
+        first_step_cells: dict[Position, set[Position]] = defaultdict(set)
+        for snake_id, variants in self._variants_by_id.items():
+            if not variants:
+                continue
+            longest_variant = max(len(snake) for snake in variants)
+            growth_by_id[snake_id] = longest_variant - self._original_lengths[snake_id]
+            first_steps = {
+                snake.my_first_step
+                for snake in variants
+                if 1 < snake._steps <= len(snake)
+            }
+            for step in first_steps:
+                first_step_cells[
+                    self.bounderies.get_position_after_step(snake_id, step)
+                ].add(snake_id)
         for snake in self.possible_snakes:
-            for position in self._deterministic_part_of_snake(snake):
-                deterministik_snake_bodies[position].add(snake.id)
-        for snake in self.possible_snakes.copy():
+            if self._is_biting_other_snake(snake, growth_by_id, first_step_cells):
+                self._remove_variant(snake)
+
+    def _is_biting_other_snake(
+        self,
+        snake: FutureSnake,
+        growth_by_id: dict[Position, int],
+        first_step_cells: dict[Position, set[Position]],
+    ) -> bool:
+        cell = self.bounderies.cell_index(snake.head)
+        for other_id, vacating_turn in self._vacating_turns[cell]:  # type: ignore
             if (
-                snake.head in deterministik_snake_bodies.keys()
-                and self._is_not_just_another_variant_of_myself(
-                    deterministik_snake_bodies, snake
-                )
+                other_id != snake.id
+                and other_id in growth_by_id
+                and snake._steps < vacating_turn + growth_by_id[other_id]
             ):
-                self.possible_snakes.remove(snake)
+                return True
+        other_ids = first_step_cells.get(snake.head)
+        return other_ids is not None and len(other_ids - {snake.id}) > 0
 
-    def _deterministic_part_of_snake(self, snake: FutureSnake) -> list[Position]:
-        start_index = self.simulated_turns
-        return snake.head_and_body[start_index:]
+    def _prune_variants_of_other_snakes(self, max_variants: int):
+        pruned_variants = 0
+        for snake_id, variants_of_snake in self._variants_by_id.items():
+            if snake_id == self._my_snake_id or len(variants_of_snake) <= max_variants:
+                continue
+            variants = sorted(variants_of_snake, key=self._get_pruning_order)
+            for snake in variants[max_variants:]:
+                self._remove_variant(snake)
+            pruned_variants += len(variants) - max_variants
+        self.pruned_variants_per_turn.append(pruned_variants)
+
+    def _get_pruning_order(self, snake: FutureSnake) -> tuple:
+        # Nearest to my snake first, then most paths, then by body (to be stable)
+        distance = abs(snake.head.x - self._my_head.x) + abs(
+            snake.head.y - self._my_head.y
+        )
+        cells = tuple(self.bounderies.cell_index(pos) for pos in snake.head_and_body)
+        return (distance, -snake.multiplicity, cells)
 
-    def _is_not_just_another_variant_of_myself(
-        self, deterministik_snake_bodies: dict, snake: FutureSnake
-    ) -> bool:
-        return len(deterministik_snake_bodies[snake.head] - {snake.id}) > 0
+    def _remove_variant(self, snake: FutureSnake):
+        self._variants_by_id[snake.id].remove(snake)
 
     def _remove_eaten_food(self, orig_snakes: Iterable[Snake]):
         for snake in orig_snakes:
@@ -386,38 +925,206 @@ class PossibleFutureBoard:
         if self.is_food_available_for(snake):
             self.food.remove(snake.head)
 
-    def is_wall(self, pos: Position) -> bool:
-        return self.bounderies.is_wall(pos)
+    @property
+    def possible_snakes(self) -> set[FutureSnake]:
+        """Variants of all snakes (a new set)."""
+        return set(chain.from_iterable(self._variants_by_id.values()))
 
     def get_my_survived_snakes(self) -> set[FutureSnake]:
-        return {snake for snake in self.possible_snakes if snake.is_me}
+        """Variants of my snake (the partition of the board, don't modify it)."""
+        return self._variants_by_id.get(self._my_snake_id, set())
+
+    def get_variants_of_other_snakes(self) -> Iterator[FutureSnake]:
+        for snake_id, variants in self._variants_by_id.items():
+            if snake_id != self._my_snake_id:
+                yield from variants
+
+    def count_my_survived_snakes(self) -> int:
+        """Count all paths of my snake, including the merged ones."""
+        return sum(snake.multiplicity for snake in self.get_my_survived_snakes())
+
+    def count_variants(self) -> int:
+        """Count variants of all snakes on the board (merged ones count once)."""
+        return sum(len(variants) for variants in self._variants_by_id.values())
 
     def next_turn(self) -> None:
-        orig_snakes = self.possible_snakes.copy()
+        orig_snakes = self.possible_snakes
         self._remove_eaten_food(orig_snakes)
         self._prepare_future_board(orig_snakes)
         self.simulated_turns += 1
         if self.recorder:
             self.recorder.save(self)
 
-    def register_recorder(self, recorder: Recorder):
-        self.recorder = recorder
-        self.recorder.save(self)
+    def resume(self, variants: Iterable[FutureSnake], simulated_turns: int):
+        """Continue with the variants of a later turn instead of this turn.
+
+        The variants have to be derived from the snakes of the board (e.g. by
+        FutureSnake.rebase_on). Food is removed, if any variant's head passed
+        it on the way (not if it's beneath a head, it's eaten with the next turn)."""
+        self._variants_by_id = defaultdict(set)
+        self._transpositions = dict()
+        self._other_bodies = None
+        self._longest_other_heads = None
+        for variant in variants:
+            self._add_or_merge_variant(variant)
+            for pos in variant.get_path()[:-1]:
+                self.food.discard(pos)
+        self._transpositions = dict()
+        self.simulated_turns = simulated_turns
+        if self.recorder:
+            self.recorder.save(self)
 
     def does_my_snake_bite_or_collide_with_another_snake(
         self, my_snake: FutureSnake
     ) -> bool:
         assert my_snake.is_me
-        for other_snake in self.possible_snakes:
-            if other_snake.is_me:
+        if my_snake.head in self._get_other_bodies():
+            return True
+        return self._is_possible_dangerous_head_collision(my_snake)
+
+    def _is_possible_dangerous_head_collision(self, my_snake: FutureSnake) -> bool:
+        longest_other_head = self._get_longest_other_heads().get(my_snake.head, 0)
+        return len(my_snake) <= longest_other_head
+
+    def _get_other_bodies(self) -> dict[Position, set[Position]]:
+        if self._other_bodies is None:
+            self._other_bodies = defaultdict(set)
+            for other_snake in self.get_variants_of_other_snakes():
+                for position in islice(other_snake._iter_head_and_body(), 1, None):
+                    self._other_bodies[position].add(other_snake.id)
+        return self._other_bodies
+
+    def _get_longest_other_heads(self) -> dict[Position, int]:
+        if self._longest_other_heads is None:
+            self._longest_other_heads = dict()
+            for other_snake in self.get_variants_of_other_snakes():
+                self._longest_other_heads[other_snake.head] = max(
+                    len(other_snake), self._longest_other_heads.get(other_snake.head, 0)
+                )
+        return self._longest_other_heads
+
+
+class BitboardPossibleFutureBoard(PossibleFutureBoard):
+    """PossibleFutureBoard checking collisions with bitboards instead of lists of positions.
+
+    Every cell of the board is one bit of an integer (bit index: y * width + x).
+    Every variant gets a mask of the deterministic part of its body, derived from
+    the mask of the mother when the variant is created. Together with the occupancy
+    masks of the snakes themselves, checks for biting itself or other snakes are
+    single AND operations.
+
+    The results are exactly the same as the results of the PossibleFutureBoard.
+    """
+
+    def __init__(
+        self,
+        board: Board,
+        my_first_steps: Optional[set[NextStep]] = None,
+        max_variants_per_snake: Optional[int] = None,
+    ):
+        self._deterministic_masks: dict[Snake, int] = dict()
+        self._mother_deterministic_masks: dict[Snake, int] = dict()
+        self._other_bodies_mask: Optional[int] = None
+        super().__init__(board, my_first_steps, max_variants_per_snake)
+
+    def _prepare_future_board(self, orig_snakes: Iterable[Snake]):
+        self._mother_deterministic_masks = self._deterministic_masks
+        self._deterministic_masks = dict()
+        self._other_bodies_mask = None
+        super()._prepare_future_board(orig_snakes)
+        # Don't keep the previous generation of variants alive
+        self._mother_deterministic_masks = dict()
+
+    def _add_possible_variants_of_one_snake_to_future_board(
+        self, original_snake: Snake | FutureSnake
+    ):
+        mother_deterministic_mask = self._get_mother_deterministic_mask(original_snake)
+        vacated_tail_bit = self._get_bit_of_tail_vacated_by(original_snake)
+        has_food = self.is_food_available_for(original_snake)
+        for step, _, future_head in self._get_moves_of(original_snake):
+            future_snake = original_snake.calculate_future_snake(
+                step, has_food, future_head, self.keep_ancestors
+            )
+            if future_snake.bites_itself():
                 continue
-            if my_snake.head in other_snake.body_without_head:
-                return True
-            if self._is_possible_dangerous_head_collision(my_snake, other_snake):
-                return True
-        return False
+            deterministic_mask = mother_deterministic_mask
+            if len(future_snake) == len(original_snake):
+                deterministic_mask &= ~vacated_tail_bit
+            if self._add_or_merge_variant(future_snake) is future_snake:
+                self._deterministic_masks[future_snake] = deterministic_mask
+
+    def _get_mother_deterministic_mask(self, snake: Snake | FutureSnake) -> int:
+        # Deterministic part of the new variant: body of the mother from index
+        # simulated_turns - 1 onwards (without the vacated tail).
+        if self.simulated_turns == 1:
+            return self.bounderies.cells_mask(snake.head_and_body)
+        return self._mother_deterministic_masks[snake]
+
+    def _get_bit_of_tail_vacated_by(self, snake: Snake | FutureSnake) -> int:
+        if snake.is_tail_stacked():
+            return 0
+        return self.bounderies.cell_bit(snake.tail)
+
+    def _remove_snakes_biting_other_snakes(self):
+        deterministic_masks_by_id: dict[Position, int] = defaultdict(int)
+        possible_snakes = self.possible_snakes
+        for snake in possible_snakes:
+            deterministic_masks_by_id[snake.id] |= self._deterministic_masks[snake]
+        masks_of_other_snakes = {
+            snake_id: self._combine_masks_of_other_ids(
+                deterministic_masks_by_id, snake_id
+            )
+            for snake_id in deterministic_masks_by_id
+        }
+        for snake in possible_snakes:
+            if self.bounderies.cell_bit(snake.head) & masks_of_other_snakes[snake.id]:
+                self._remove_variant(snake)
+
+    def _remove_variant(self, snake: FutureSnake):
+        super()._remove_variant(snake)
+        del self._deterministic_masks[snake]
+
+    def resume(self, variants: Iterable[FutureSnake], simulated_turns: int):
+        variants = list(variants)
+        # Deterministic part: the part of the original body not vacated yet
+        self._deterministic_masks = {
+            variant: self.bounderies.cells_mask(
+                islice(variant._iter_head_and_body(), variant._steps, None)
+            )
+            for variant in variants
+        }
+        self._other_bodies_mask = None
+        super().resume(variants, simulated_turns)
+        kept_variants = self.possible_snakes
+        self._deterministic_masks = {
+            variant: mask
+            for variant, mask in self._deterministic_masks.items()
+            if variant in kept_variants
+        }
+
+    def _combine_masks_of_other_ids(
+        self, masks_by_id: dict[Position, int], snake_id: Position
+    ) -> int:
+        mask = 0
+        for other_id, other_mask in masks_by_id.items():
+            if other_id != snake_id:
+                mask |= other_mask
+        return mask
 
-    def _is_possible_dangerous_head_collision(
-        self, my_snake: FutureSnake, other_snake: FutureSnake
+    def does_my_snake_bite_or_collide_with_another_snake(
+        self, my_snake: FutureSnake
     ) -> bool:
-        return my_snake.head == other_snake.head and len(my_snake) <= len(other_snake)
+        assert my_snake.is_me
+        if self.bounderies.cell_bit(my_snake.head) & self._get_other_bodies_mask():
+            return True
+        return self._is_possible_dangerous_head_collision(my_snake)
+
+    def _get_other_bodies_mask(self) -> int:
+        """Occupancy mask of the bodies (without heads) of all other snakes."""
+        if self._other_bodies_mask is None:
+            bodies_mask = 0
+            for other_snake in self.get_variants_of_other_snakes():
+                head_bit = self.bounderies.cell_bit(other_snake.head)
+                bodies_mask |= other_snake._occupied & ~head_bit
+            self._other_bodies_mask = bodies_mask
+        return self._other_bodies_mask
@@ -0,0 +1,39 @@
+"""Configuration of the production server (gunicorn).
+
+    gunicorn --config python:battle_snake.gunicorn_config battle_snake.server:app
+
+Environment variables:
+    PORT: Port to listen to (default 8080).
+    WEB_CONCURRENCY: Amount of worker processes (default: amount of CPUs).
+    WEB_THREADS: Threads per worker process (default 2), so /start and /end
+        don't have to wait for a /move of another game. The threads share
+        the simulation costs of the games (guarded by a lock, see interactor).
+    SIMULATION_WORKERS: Processes per worker simulating the first steps
+        of my snake in parallel (default 0: no parallel simulation).
+"""
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8080')}"
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+threads = int(os.environ.get("WEB_THREADS", "2"))
+# Import and warm up the app once before the workers are forked
+preload_app = True
+
+
+def on_starting(server):
+    from battle_snake.server import warm_up
+
+    warm_up()
+    print(f"\nRunning Battlesnake server at http://{bind} ({workers} workers)")
+    if workers > 1:
+        server.log.warning(
+            "GET /metrics shows the moves of the worker answering the request"
+            f" only (1 of {workers} workers), use WEB_CONCURRENCY=1 for all moves"
+        )
+
+
+def post_fork(server, worker):
+    from battle_snake.server import init_simulation_pool
+
+    init_simulation_pool()
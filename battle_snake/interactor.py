@@ -1,18 +1,26 @@
 import logging
 import random
+import threading
 import time
-from typing import Optional
+from concurrent import futures
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import NamedTuple, Optional
 
 from battle_snake.entities import (
     AmountOfSnakesAlive,
     AmountOfSteps,
+    BitboardPossibleFutureBoard,
     Board,
     FirstStep,
+    FutureBoard,
     FutureSnake,
     NextStep,
-    PossibleFutureBoard,
+    Position,
     Recorder,
+    get_move_table,
 )
+from battle_snake.reachable import calculate_reachable_areas
+from battle_snake.request_parser import parse_board
 
 logging.basicConfig(encoding="utf-8", level=logging.INFO)
 
@@ -31,41 +39,428 @@ def get_info() -> dict:
     }
 
 
-FORECAST_DEPTH = 7
+# Maximum depth of the simulation. It stops earlier, if the next turn
+# can't be simulated before the deadline of the move.
+FORECAST_DEPTH = 12
+# Default timeout of a move (ms), if the request doesn't tell.
+DEFAULT_TIMEOUT_MS = 500
+# Part of the timeout reserved for network latency and the decision itself (ms).
+TIMEOUT_RESERVE_MS = 150
+# Time budget without any limit (ns), e.g. to replay or benchmark moves
+# (the forecast depth limits the simulation then).
+UNLIMITED_TIME_BUDGET = 10**15
+# Engine simulating the future board. All engines lead to the same results,
+# PossibleFutureBoard is kept to be able to compare (A/B) them.
+FUTURE_BOARD_ENGINE: type[FutureBoard] = BitboardPossibleFutureBoard
+# Variants kept per other snake and turn (None: all), see PossibleFutureBoard.
+# Bounds time and memory per turn, but the simulation isn't exact anymore.
+MAX_VARIANTS_PER_SNAKE: Optional[int] = None
+# Part of the time budget reserved for returning the results of the executor (ms)
+EXECUTOR_RESERVE_MS = 20
+# Games to remember simulation costs for (in case a game never ends properly)
+MAX_REMEMBERED_GAMES = 100
+# Reasons to stop the simulation (MoveDecision.stop_reason)
+STOP_READY = "ready"  # less than two first steps left, nothing to decide anymore
+STOP_DEADLINE = "deadline"
+STOP_DEPTH = "depth"
+STOP_EXECUTOR = "executor"
+# Don't simulate first steps into dead ends, if other steps lead into enough room.
+# If none of the simulated steps survives, all steps are simulated again.
+SKIP_DEAD_ENDS = False
+# Continue the simulation of the previous move of the game (see MoveDecision).
+REUSE_SIMULATION = False
+
+
+class SimulationCosts:
+    """Costs of the simulation measured during all moves of one game so far.
+
+    The duration of a turn grows with the amount of variants to be expanded,
+    so the costs are kept as (smoothed) nanoseconds per variant.
+    """
+
+    SMOOTHING = 0.3
+
+    def __init__(self):
+        self._nanoseconds_per_variant: Optional[float] = None
+
+    def save(self, duration: int, expanded_variants: int):
+        cost = duration / max(expanded_variants, 1)
+        if self._nanoseconds_per_variant is None:
+            self._nanoseconds_per_variant = cost
+        else:
+            self._nanoseconds_per_variant += self.SMOOTHING * (
+                cost - self._nanoseconds_per_variant
+            )
+
+    def predict_duration(self, variants_to_expand: int) -> Optional[float]:
+        if self._nanoseconds_per_variant is None:
+            return None
+        return variants_to_expand * self._nanoseconds_per_variant
+
+
+_simulation_costs_of_games: dict[str, SimulationCosts] = dict()
+# The server may decide moves of several games in threads of one process
+_simulation_costs_lock = threading.Lock()
+
+
+def get_simulation_costs(game_id: Optional[str]) -> SimulationCosts:
+    """Simulation costs of the game, that are kept from move to move."""
+    if game_id is None:
+        return SimulationCosts()
+    with _simulation_costs_lock:
+        if game_id not in _simulation_costs_of_games:
+            if len(_simulation_costs_of_games) >= MAX_REMEMBERED_GAMES:
+                oldest_game_id = next(iter(_simulation_costs_of_games))
+                del _simulation_costs_of_games[oldest_game_id]
+            _simulation_costs_of_games[game_id] = SimulationCosts()
+        return _simulation_costs_of_games[game_id]
+
+
+class KeptSimulation(NamedTuple):
+    """Last generation of variants simulated for a move of a game."""
+
+    turn: int
+    simulated_turns: int
+    variants: list[FutureSnake]
+
+
+_kept_simulations_of_games: dict[str, KeptSimulation] = dict()
+
+
+def keep_simulation(game_id: str, simulation: KeptSimulation):
+    """Keep the simulation of the game for its next move (see take_simulation)."""
+    with _simulation_costs_lock:
+        _kept_simulations_of_games.pop(game_id, None)
+        if len(_kept_simulations_of_games) >= MAX_REMEMBERED_GAMES:
+            oldest_game_id = next(iter(_kept_simulations_of_games))
+            del _kept_simulations_of_games[oldest_game_id]
+        _kept_simulations_of_games[game_id] = simulation
+
+
+def take_simulation(game_id: str) -> Optional[KeptSimulation]:
+    """Simulation kept for the game (once, it isn't kept anymore afterwards)."""
+    with _simulation_costs_lock:
+        return _kept_simulations_of_games.pop(game_id, None)
+
+
+def forget_game(game_id: str):
+    """Drop everything kept for the game (after the game has ended)."""
+    with _simulation_costs_lock:
+        _simulation_costs_of_games.pop(game_id, None)
+        _kept_simulations_of_games.pop(game_id, None)
 
 
 class MoveDecision:
-    """Decision maker for the next move of my snake."""
+    """Decision maker for the next move of my snake.
+
+    The simulation goes deeper turn by turn (up to forecast_depth, by default
+    FORECAST_DEPTH) as long as the next turn is expected to be finished before
+    the deadline of the move.
+    The expected duration of the next turn is based on the costs per variant
+    measured during all moves of the game so far. For the very first turn of
+    a game it's the duration of the first turn multiplied by its growth of
+    the amount of variants.
+
+    If an executor is given, only the first turn is simulated here. The further
+    turns are simulated per first step of my snake by the executor (e.g. a
+    ProcessPoolExecutor, see create_simulation_pool) and merged afterwards.
+    Other snakes only see the variants of my snake of the same first step then,
+    so the results may differ a little from the results of a single simulation.
+    The jobs get the deadline of the move (wall clock time), so waiting for a
+    worker counts, too. A first step without result at the deadline (or with
+    a failed job) keeps the first turn only.
+
+    With REUSE_SIMULATION (and without executor), the last turn simulated for
+    the previous move of the game is kept. The next move continues with its
+    variants that match the moves the snakes actually made, so the simulation
+    starts one turn less deep than the previous one ended. Food that appeared
+    in the meantime is unknown to the variants and the turns in between aren't
+    saved one by one (only the food on the path of my snake), so the results
+    may differ a little from the results of a new simulation.
+    A resumed simulation isn't kept again: its variants were merged regardless
+    of their second step, so the next move simulates from scratch.
+    """
 
-    def __init__(self, game_request: dict):
+    def __init__(
+        self,
+        game_request: dict,
+        future_board_engine: Optional[type[FutureBoard]] = None,
+        executor: Optional[Executor] = None,
+        my_first_steps: Optional[set[NextStep]] = None,
+        time_budget: Optional[int] = None,
+        board: Optional[Board] = None,
+        forecast_depth: Optional[int] = None,
+    ):
         self._start_time: int = time.perf_counter_ns()
-        self.board: Board = Board.from_dict(game_request)
-        self.future_board: PossibleFutureBoard = PossibleFutureBoard(self.board)
+        if time_budget is None:
+            time_budget = self._get_time_budget(game_request)
+        self._deadline: int = self._start_time + time_budget
+        self._game_id: Optional[str] = game_request.get("game", {}).get("id")
+        self._turn: Optional[int] = game_request.get("turn")
+        self._costs = get_simulation_costs(self._game_id)
+        self._game_request = game_request
+        self._executor = executor
+        self._forecast_depth: int = forecast_depth or FORECAST_DEPTH
+        self.board: Board = board or parse_board(game_request)
+        self.reachable_areas: Optional[dict[NextStep, int]] = None
+        self._is_restricted_by_room = False
+        if my_first_steps is None and SKIP_DEAD_ENDS:
+            my_first_steps = self._get_first_steps_into_room()
+        self._engine = future_board_engine or FUTURE_BOARD_ENGINE
+        self._start_simulation(my_first_steps)
+        # Why the simulation stopped: STOP_READY, STOP_DEADLINE, STOP_DEPTH
+        # or STOP_EXECUTOR (further turns simulated by the executor)
+        self.stop_reason: Optional[str] = None
+
+    def _start_simulation(self, my_first_steps: Optional[set[NextStep]]):
+        """Simulate the first turn of my first steps (None: all steps)."""
+        self._my_first_steps = my_first_steps
+        start_of_first_turn = time.perf_counter_ns()
+        self.future_board: FutureBoard = self._engine(
+            self.board, my_first_steps, MAX_VARIANTS_PER_SNAKE
+        )
         self._history = MyFutureHistory()
         self.future_board.register_recorder(self._history)
-        self.tactics = Tactics(self._history, self.board)
+        self._last_turn_duration: int = time.perf_counter_ns() - start_of_first_turn
+        self._last_branching_factor: float = self.variants_per_turn[0] / max(
+            len(self.board.snakes), 1
+        )
+        self.tactics = Tactics(self._history, self.board, self.reachable_areas)
+
+    @property
+    def variants_per_turn(self) -> list[int]:
+        """Variants of all snakes after every simulated turn (first turn first)."""
+        return self._history.variants_per_turn
+
+    def _get_first_steps_into_room(self) -> Optional[set[NextStep]]:
+        """First steps leading into enough room for my snake (None: all steps).
+
+        All steps are simulated, if no step or every possible step leads into
+        enough room (at least as many cells as my snake is long). If none of
+        these steps survives the simulation, all steps are simulated again."""
+        self.reachable_areas = calculate_reachable_areas(self.board)
+        my_length = len(self.board.my_snake)
+        possible_steps = {
+            step for step, area in self.reachable_areas.items() if area > 0
+        }
+        steps_into_room = {
+            step for step, area in self.reachable_areas.items() if area >= my_length
+        }
+        if not steps_into_room or steps_into_room == possible_steps:
+            return None
+        logging.info(f"Dead ends avoided, simulating {steps_into_room} only")
+        self._is_restricted_by_room = True
+        return steps_into_room
+
+    def _get_time_budget(self, game_request: dict) -> int:
+        timeout_ms = game_request.get("game", {}).get("timeout", DEFAULT_TIMEOUT_MS)
+        return max(timeout_ms - TIMEOUT_RESERVE_MS, 0) * 1_000_000
 
     def decide(self) -> NextStep:
         """Find decision for next step for my snake"""
-        self._calculate_simulation()
+        self.simulate()
         decision = self.tactics.decide()
         logging.info(f"Decision for next step: {decision}")
         return decision
 
+    def simulate(self) -> "MyFutureHistory":
+        """Simulate the future board and return the history of my snake."""
+        self._calculate_simulation_of_first_steps()
+        if self._is_restricted_by_room and not self._has_survivors():
+            logging.info("No step into enough room survives, simulating all steps")
+            self._is_restricted_by_room = False
+            self._start_simulation(None)
+            self._calculate_simulation_of_first_steps()
+        return self._history
+
+    def _calculate_simulation_of_first_steps(self):
+        if self._executor is None:
+            self._calculate_simulation()
+        else:
+            self._calculate_simulation_per_first_step()
+
+    def _has_survivors(self) -> bool:
+        """Is any of my simulated first steps alive after the last simulated turn?"""
+        return any(
+            self._history.all_my_snakes_definitely_dead_after_how_many_steps(
+                FirstStep(first_step)
+            )
+            > self._history.simulated_turns
+            for first_step in self._my_first_steps or NextStep
+        )
+
+    @property
+    def simulated_turns(self) -> int:
+        """Depth reached by the simulation."""
+        return self._history.simulated_turns
+
+    def _calculate_simulation_per_first_step(self):
+        if self._is_ready_for_decision():
+            self.stop_reason = STOP_READY
+            return
+        self.stop_reason = STOP_EXECUTOR
+        deadline = time.time() + (self._deadline - time.perf_counter_ns()) / 1e9
+        simulation_deadline = deadline - EXECUTOR_RESERVE_MS / 1000
+        branches = {
+            first_step: self._executor.submit(  # type: ignore
+                simulate_first_step,
+                self._game_request,
+                first_step,
+                self._engine,
+                simulation_deadline,
+                self._forecast_depth,
+            )
+            for first_step in self._get_first_steps_of_survivors()
+        }
+        for first_step, branch in branches.items():
+            try:
+                history = branch.result(timeout=max(deadline - time.time(), 0))
+            except futures.TimeoutError:
+                logging.info(f"No result of the executor for {first_step} in time")
+                branch.cancel()
+                continue
+            except Exception:
+                # e.g. BrokenProcessPool, the first turn is better than no move
+                logging.exception(f"Simulation of {first_step} by the executor failed")
+                continue
+            self._history.add_turns_of_branch(FirstStep(first_step), history)
+
     def _calculate_simulation(self):
-        for _ in range(FORECAST_DEPTH - 1):
+        is_resumed = False
+        if self._is_reusing_simulation():
+            self.future_board.keep_first_steps_apart = True
+            is_resumed = self._resume_kept_simulation()
+        self.stop_reason = STOP_DEPTH
+        while self.future_board.simulated_turns < self._forecast_depth:
             if self._is_ready_for_decision():
+                self.stop_reason = STOP_READY
+                break
+            if not self._is_time_left_for_next_turn():
+                logging.info(
+                    f"No time left for next turn after {self.future_board.simulated_turns} turns"
+                )
+                self.stop_reason = STOP_DEADLINE
                 break
-            self.future_board.next_turn()
+            self._simulate_next_turn()
+        if self._is_reusing_simulation() and not is_resumed:
+            keep_simulation(
+                self._game_id,  # type: ignore
+                KeptSimulation(
+                    self._turn,  # type: ignore
+                    self.future_board.simulated_turns,
+                    list(self.future_board.possible_snakes),
+                ),
+            )
+
+    def _is_reusing_simulation(self) -> bool:
+        return (
+            REUSE_SIMULATION
+            and self._engine.can_resume
+            and self._game_id is not None
+            and self._turn is not None
+        )
+
+    def _resume_kept_simulation(self) -> bool:
+        """Resume the simulation kept for the previous move, if it matches."""
+        kept = take_simulation(self._game_id)  # type: ignore
+        # Nothing gained from a simulation of less than three turns
+        if kept is None or kept.turn + 1 != self._turn or kept.simulated_turns < 3:
+            return False
+        # The ID of a snake is its head, one turn later it's the head of the body
+        snakes_by_previous_head = {
+            snake.head_and_body[1]: snake
+            for snake in self.board.snakes
+            if len(snake) > 1
+        }
+        variants = []
+        for variant in kept.variants:
+            snake = snakes_by_previous_head.get(variant.id)
+            rebased_variant = snake and variant.rebase_on(snake)
+            if rebased_variant is None:
+                continue
+            if (
+                rebased_variant.is_me
+                and self._my_first_steps is not None
+                and rebased_variant.my_first_step not in self._my_first_steps
+            ):
+                continue
+            variants.append(rebased_variant)
+        if not any(variant.is_me for variant in variants):
+            return False
+        for variant in variants:
+            if variant.is_me:
+                self._history.save_food_on_path(variant, self.board.food)
+        self.future_board.resume(variants, kept.simulated_turns - 1)
+        logging.info(f"Resumed simulation after {kept.simulated_turns - 1} turns")
+        return True
+
+    def _is_time_left_for_next_turn(self) -> bool:
+        expected_duration = self._costs.predict_duration(
+            self.future_board.count_variants()
+        )
+        if expected_duration is None:
+            expected_duration = self._last_turn_duration * self._last_branching_factor
+        return time.perf_counter_ns() + expected_duration < self._deadline
+
+    def _simulate_next_turn(self):
+        variants_before = self.future_board.count_variants()
+        start = time.perf_counter_ns()
+        self.future_board.next_turn()
+        self._last_turn_duration = time.perf_counter_ns() - start
+        self._costs.save(self._last_turn_duration, variants_before)
+        self._last_branching_factor = self.variants_per_turn[-1] / max(
+            variants_before, 1
+        )
 
     def _is_ready_for_decision(self) -> bool:
+        first_steps = self._get_first_steps_of_survivors()
+        simulated_first_steps = (
+            len(NextStep) if self._my_first_steps is None else len(self._my_first_steps)
+        )
+        return len(first_steps) < min(2, simulated_first_steps)
+
+    def _get_first_steps_of_survivors(self) -> set[NextStep]:
         survivors = self.future_board.get_my_survived_snakes()
-        first_steps = {snake.get_my_first_step() for snake in survivors}
-        return len(first_steps) < 2
+        return {snake.get_my_first_step() for snake in survivors}
+
+
+def simulate_first_step(
+    game_request: dict,
+    first_step: NextStep,
+    future_board_engine: type[FutureBoard],
+    deadline: float,
+    forecast_depth: Optional[int] = None,
+) -> "MyFutureHistory":
+    """Simulate the future of my snake starting with the first step only.
+
+    Runs within a worker of the executor given to MoveDecision. The simulation
+    stops at the deadline (time.time()), no matter how long the job waited."""
+    time_budget = max(int((deadline - time.time()) * 1e9), 0)
+    move_decision = MoveDecision(
+        game_request,
+        future_board_engine,
+        my_first_steps={first_step},
+        time_budget=time_budget,
+        forecast_depth=forecast_depth,
+    )
+    return move_decision.simulate()
+
+
+def create_simulation_pool(workers: int) -> Optional[ProcessPoolExecutor]:
+    """Pool of processes simulating the first steps of my snake in parallel.
+
+    Create it once when the server starts. No pool for less than 2 workers."""
+    if workers < 2:
+        return None
+    return ProcessPoolExecutor(max_workers=workers, initializer=_warm_up_worker)
+
+
+def _warm_up_worker():
+    get_move_table(11, 11)
 
 
 class MyFutureHistory(Recorder):
-    """Recorder of information of my snake generated by simulations from PossibleFutureBoard."""
+    """Recorder of information of my snake generated by simulations from FutureBoard."""
 
     def __init__(self):
         self._counter_of_snakes_alive_after_n_steps: dict[
@@ -75,17 +470,73 @@ class MyFutureHistory(Recorder):
             FirstStep, Optional[AmountOfSteps]
         ] = {FirstStep(first_step): None for first_step in NextStep}
 
-        self._current_future_board: PossibleFutureBoard = None  # type: ignore
+        self._current_future_board: FutureBoard = None  # type: ignore
         self._dangerous_snake_first_step: dict[FirstStep, bool] = dict()
-
-    def save(self, future_board: PossibleFutureBoard) -> None:
-        """Save interesting information of current state of PossibleFutureBoard"""
+        self._simulated_turns: int = 0
+        # Variants of all snakes after every simulated turn. With branches of the
+        # first steps added, the sum of the variants of all branches.
+        self.variants_per_turn: list[int] = []
+
+    def __getstate__(self) -> dict:
+        # Don't send the whole board to another process
+        state = self.__dict__.copy()
+        state["_current_future_board"] = None
+        return state
+
+    def save(self, future_board: FutureBoard) -> None:
+        """Save interesting information of current state of FutureBoard"""
         self._current_future_board = future_board
+        self._simulated_turns = future_board.simulated_turns
+        # Turns resumed from the previous move weren't simulated (0 variants)
+        del self.variants_per_turn[future_board.simulated_turns - 1 :]
+        self.variants_per_turn.extend(
+            [0] * (future_board.simulated_turns - 1 - len(self.variants_per_turn))
+        )
+        self.variants_per_turn.append(future_board.count_variants())
         for my_snake in future_board.get_my_survived_snakes():
             self._increment_snake_alive_counter(my_snake)
             self._check_for_dangerous_snake_in_first_step(my_snake)
             self._check_for_food(my_snake)
 
+    def save_food_on_path(self, my_snake: FutureSnake, food: set[Position]):
+        """Save the first food on the path of my snake (turns not saved one by one)."""
+        first_step = FirstStep(my_snake.get_my_first_step())
+        found_after_n_steps = self._found_first_food_after_n_steps[first_step]
+        for amount_of_steps, pos in enumerate(my_snake.get_path(), 1):
+            if pos in food:
+                if found_after_n_steps is None or amount_of_steps < found_after_n_steps:
+                    self._found_first_food_after_n_steps[first_step] = AmountOfSteps(
+                        amount_of_steps
+                    )
+                return
+
+    @property
+    def simulated_turns(self) -> int:
+        """Turns simulated by the FutureBoard saved last."""
+        return self._simulated_turns
+
+    def add_turns_of_branch(self, first_step: FirstStep, branch: "MyFutureHistory"):
+        """Add the turns after the first turn, simulated for this first step only."""
+        for (
+            amount_of_steps,
+            amount_of_snakes_alive,
+        ) in branch._counter_of_snakes_alive_after_n_steps[first_step].items():
+            if amount_of_steps > 1:
+                self._counter_of_snakes_alive_after_n_steps[first_step][
+                    amount_of_steps
+                ] = amount_of_snakes_alive
+        if self._found_first_food_after_n_steps[first_step] is None:
+            self._found_first_food_after_n_steps[
+                first_step
+            ] = branch._found_first_food_after_n_steps[first_step]
+        self._simulated_turns = max(self._simulated_turns, branch.simulated_turns)
+        # The first turn of the branch is a part of the first turn simulated here
+        for turn, amount_of_variants in enumerate(branch.variants_per_turn[1:], 1):
+            if turn < len(self.variants_per_turn):
+                self.variants_per_turn[turn] += amount_of_variants
+            else:
+                self.variants_per_turn.append(amount_of_variants)
+
     def _increment_snake_alive_counter(self, my_snake: FutureSnake):
         first_step = FirstStep(my_snake.get_my_first_step())
         amount_of_steps = AmountOfSteps(self._current_future_board.simulated_turns)
@@ -96,7 +547,7 @@ class MyFutureHistory(Recorder):
         )
         self._counter_of_snakes_alive_after_n_steps[first_step][
             amount_of_steps
-        ] = AmountOfSnakesAlive(amount_of_snakes_alive + 1)
+        ] = AmountOfSnakesAlive(amount_of_snakes_alive + my_snake.multiplicity)
 
     def _get_amount_of_snakes_alive_for_first_step_and_current_turn(
         self, first_step: FirstStep, amount_of_steps: AmountOfSteps
@@ -153,12 +604,28 @@ class MyFutureHistory(Recorder):
         return self._dangerous_snake_first_step[FirstStep(first_step)]
 
 
+# Parts of the tactics making the decision (Tactics.tactic)
+TACTIC_ONE_STEP_LEFT = "one_step_left"
+TACTIC_NO_WAY_OUT = "no_way_out"
+TACTIC_FOOD_NEARBY = "food_nearby"
+TACTIC_FOOD_FAR_AWAY = "food_far_away"
+TACTIC_LUCK = "luck"
+
+
 class Tactics:
-    def __init__(self, history: MyFutureHistory, board: Board):
+    def __init__(
+        self,
+        history: MyFutureHistory,
+        board: Board,
+        reachable_areas: Optional[dict[NextStep, int]] = None,
+    ):
         self._history = history
+        self._reachable_areas = reachable_areas
         self._latest_surviors_first_steps: set[FirstStep] = None  # type: ignore
         self._smelt_food: dict[AmountOfSteps, FirstStep] = dict()  # type: ignore
         self._board = board
+        # Part of the tactics that made the decision (one of the TACTIC_ constants)
+        self.tactic: Optional[str] = None
 
     def decide(self) -> NextStep:
         """Here's the decision made based on collected data of the simulation"""
@@ -168,21 +635,39 @@ class Tactics:
             logging.info(
                 f"There's one step left only: {self._latest_surviors_first_steps}"
             )
+            self.tactic = TACTIC_ONE_STEP_LEFT
             return self._latest_surviors_first_steps.pop()
         if self._there_is_no_way_out():
             logging.info(f"I'm dying ... arghhhh ...")
+            self.tactic = TACTIC_NO_WAY_OUT
             return NextStep.UP
         self._try_to_smell_food_on_path()
         if self._i_can_smell_food():
+            self.tactic = TACTIC_FOOD_NEARBY
             return self._get_first_step_to_nearest_food()
         else:
             first_step_to_food_far_away = self._find_food_i_cant_smell()
             if first_step_to_food_far_away is not None:
+                self.tactic = TACTIC_FOOD_FAR_AWAY
                 return first_step_to_food_far_away
+        self.tactic = TACTIC_LUCK
+        steps_with_most_room = self._get_steps_with_most_room()
         logging.info(
-            f"I'll guess one by luck from, because there's no food securely reachable... {self._latest_surviors_first_steps}"
+            f"I'll guess one by luck from, because there's no food securely reachable... {steps_with_most_room}"
         )
-        return random.choice(list(self._latest_surviors_first_steps))
+        return random.choice(list(steps_with_most_room))
+
+    def _get_steps_with_most_room(self) -> set[FirstStep]:
+        if self._reachable_areas is None:
+            self._reachable_areas = calculate_reachable_areas(self._board)
+        most_room = max(
+            self._reachable_areas[step] for step in self._latest_surviors_first_steps
+        )
+        return {
+            step
+            for step in self._latest_surviors_first_steps
+            if self._reachable_areas[step] == most_room
+        }
 
     def _init_with_first_steps_of_last_survivors(self):
         logging.info("\n" + "New Decision   " + "*" * 30)
@@ -194,7 +679,7 @@ class Tactics:
 
     def _get_first_steps_of_latest_survivor(self) -> set[FirstStep]:
         surviors_first_steps = set()
-        for max_steps in range(FORECAST_DEPTH, 0, -1):
+        for max_steps in range(self._history.simulated_turns, 0, -1):
             surviors_first_steps = self._find_survivors(max_steps)
             if surviors_first_steps:
                 break
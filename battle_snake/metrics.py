@@ -0,0 +1,175 @@
+"""Metrics of the move decisions in the Prometheus text format (GET /metrics).
+
+Minimal counters and histograms without any further dependency. The values are
+kept per server process: with several gunicorn workers every scrape shows the
+metrics of the worker answering it (the server warns about it at start-up), so
+run a single worker (WEB_CONCURRENCY=1) to get the metrics of all moves.
+
+With a simulation pool (SIMULATION_WORKERS), the variants of the turns after the
+first one are the sums over the simulated first steps.
+"""
+import threading
+from typing import Optional
+
+from battle_snake.interactor import FORECAST_DEPTH, MoveDecision
+
+_lock = threading.Lock()
+
+
+class Counter:
+    """Counter with an optional label."""
+
+    def __init__(self, name: str, documentation: str, label: Optional[str] = None):
+        self.name = name
+        self.documentation = documentation
+        self.label = label
+        self._values: dict[Optional[str], float] = dict()
+
+    def inc(self, label_value: Optional[str] = None, amount: float = 1):
+        with _lock:
+            self._values[label_value] = self._values.get(label_value, 0) + amount
+
+    def get(self, label_value: Optional[str] = None) -> float:
+        return self._values.get(label_value, 0)
+
+    def render(self) -> list[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} counter",
+        ]
+        for label_value, value in sorted(self._values.items(), key=_by_label):
+            lines.append(f"{self.name}{_labels(self.label, label_value)} {value}")
+        return lines
+
+
+class Histogram:
+    """Histogram with fixed buckets and an optional label."""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        buckets: tuple[float, ...],
+        label: Optional[str] = None,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = buckets
+        self.label = label
+        # Per label value: counts per bucket (not cumulative), sum, count
+        self._values: dict[Optional[str], tuple[list[int], list[float]]] = dict()
+
+    def observe(self, value: float, label_value: Optional[str] = None):
+        with _lock:
+            if label_value not in self._values:
+                self._values[label_value] = ([0] * len(self.buckets), [0.0, 0])
+            bucket_counts, sum_and_count = self._values[label_value]
+            for index, upper_bound in enumerate(self.buckets):
+                if value <= upper_bound:
+                    bucket_counts[index] += 1
+                    break
+            sum_and_count[0] += value
+            sum_and_count[1] += 1
+
+    def get_count(self, label_value: Optional[str] = None) -> int:
+        if label_value not in self._values:
+            return 0
+        return int(self._values[label_value][1][1])
+
+    def render(self) -> list[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} histogram",
+        ]
+        for label_value, (bucket_counts, sum_and_count) in sorted(
+            self._values.items(), key=_by_label
+        ):
+            cumulative = 0
+            for upper_bound, bucket_count in zip(self.buckets, bucket_counts):
+                cumulative += bucket_count
+                labels = _labels(self.label, label_value, le=str(upper_bound))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _labels(self.label, label_value, le="+Inf")
+            lines.append(f"{self.name}_bucket{labels} {sum_and_count[1]}")
+            labels = _labels(self.label, label_value)
+            lines.append(f"{self.name}_sum{labels} {sum_and_count[0]}")
+            lines.append(f"{self.name}_count{labels} {sum_and_count[1]}")
+        return lines
+
+
+def _labels(label: Optional[str], label_value: Optional[str], **more: str) -> str:
+    pairs = dict(more)
+    if label is not None and label_value is not None:
+        pairs = {label: label_value, **pairs}
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{key}="{value}"' for key, value in pairs.items()) + "}"
+
+
+def _by_label(item: tuple) -> tuple:
+    label_value = item[0]
+    if label_value is not None and label_value.isdigit():
+        return (0, int(label_value), "")
+    return (1, 0, label_value or "")
+
+
+move_duration = Histogram(
+    "battlesnake_move_duration_seconds",
+    "Time to decide a move.",
+    (0.01, 0.025, 0.05, 0.1, 0.2, 0.3, 0.35, 0.4, 0.5, 1.0),
+)
+simulated_turns = Histogram(
+    "battlesnake_simulated_turns",
+    "Depth reached by the simulation of a move.",
+    tuple(float(turns) for turns in range(1, FORECAST_DEPTH + 1)),
+)
+variants = Histogram(
+    "battlesnake_variants",
+    "Variants of all snakes after a simulated turn.",
+    (10, 100, 1_000, 10_000, 100_000, 1_000_000),
+    label="turn",
+)
+simulation_stops = Counter(
+    "battlesnake_simulation_stops_total",
+    "Reasons to stop the simulation (ready: early exit, nothing left to decide).",
+    label="reason",
+)
+decisions = Counter(
+    "battlesnake_decisions_total",
+    "Parts of the tactics that made the decision.",
+    label="tactic",
+)
+pruned_variants = Counter(
+    "battlesnake_pruned_variants_total",
+    "Variants of other snakes pruned (MAX_VARIANTS_PER_SNAKE).",
+)
+ALL_METRICS = (
+    move_duration,
+    simulated_turns,
+    variants,
+    pruned_variants,
+    simulation_stops,
+    decisions,
+)
+
+
+def observe_move(move_decision: MoveDecision, duration: float):
+    """Collect the metrics of a decided move (duration in seconds)."""
+    move_duration.observe(duration)
+    simulated_turns.observe(move_decision.simulated_turns)
+    for turn, amount_of_variants in enumerate(move_decision.variants_per_turn, 1):
+        if amount_of_variants:  # 0: turn resumed from the previous move
+            variants.observe(amount_of_variants, str(turn))
+    pruned = sum(move_decision.future_board.pruned_variants_per_turn)
+    if pruned:
+        pruned_variants.inc(amount=pruned)
+    if move_decision.stop_reason is not None:
+        simulation_stops.inc(move_decision.stop_reason)
+    if move_decision.tactics.tactic is not None:
+        decisions.inc(move_decision.tactics.tactic)
+
+
+def render() -> str:
+    """All metrics in the Prometheus text format."""
+    lines = [line for metric in ALL_METRICS for line in metric.render()]
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,87 @@
+"""Room of my snake: the area reachable from the head (flood fill).
+
+Much cheaper than the simulation of all paths of all snakes, but it only
+measures the room: the other snakes are obstacles, that vacate their cells
+turn by turn from the tail (without growing), and their next steps are ignored.
+
+A cell is reached, when it's free at the turn the flood reaches it. Cells that
+are still occupied then (e.g. by the body of my own snake) are reached as soon
+as they are vacated, as long as my snake can keep on moving in the area reached
+so far meanwhile.
+"""
+from typing import Optional
+
+from battle_snake.entities import Board, NextStep, Position
+
+
+def get_vacating_turns(board: Board) -> list[int]:
+    """Turns until every cell of the board is free (0: free already).
+
+    The tail is free after one turn, the head after len(snake) turns. A stacked
+    tail (after eating) stays for one turn more."""
+    bounderies = board.bounderies
+    vacating_turns = [0] * (bounderies.width * bounderies.height)
+    for snake in board.snakes:
+        length = len(snake)
+        for index, pos in enumerate(snake.head_and_body):
+            if bounderies.is_wall(pos):
+                continue
+            cell = bounderies.cell_index(pos)
+            vacating_turns[cell] = max(vacating_turns[cell], length - index)
+    return vacating_turns
+
+
+def calculate_reachable_area(
+    board: Board,
+    start: Position,
+    start_turn: int = 1,
+    vacating_turns: Optional[list[int]] = None,
+    limit: Optional[int] = None,
+) -> int:
+    """Amount of cells reachable from the start (entered at the start turn).
+
+    0, if the start isn't free at the start turn. The flood stops as soon as
+    the limit is reached (if given)."""
+    bounderies = board.bounderies
+    if bounderies.is_wall(start):
+        return 0
+    if vacating_turns is None:
+        vacating_turns = get_vacating_turns(board)
+    moves = bounderies.move_table.moves
+    start_cell = bounderies.cell_index(start)
+    if vacating_turns[start_cell] > start_turn:
+        return 0
+    reached = {start_cell}
+    frontier = [start_cell]
+    waiting: set[int] = set()
+    turn = start_turn
+    while frontier or (waiting and turn - start_turn < len(reached)):
+        if limit is not None and len(reached) >= limit:
+            return limit
+        turn += 1
+        next_frontier = []
+        for cell in frontier:
+            for move in moves[cell]:
+                if move.cell not in reached:
+                    waiting.add(move.cell)
+        for cell in list(waiting):
+            if vacating_turns[cell] <= turn:
+                waiting.discard(cell)
+                reached.add(cell)
+                next_frontier.append(cell)
+        frontier = next_frontier
+    return len(reached) if limit is None else min(len(reached), limit)
+
+
+def calculate_reachable_areas(
+    board: Board, limit: Optional[int] = None
+) -> dict[NextStep, int]:
+    """Reachable area of my snake for every first step (0 for a wall or body)."""
+    vacating_turns = get_vacating_turns(board)
+    my_head = board.my_snake.head
+    areas = {step: 0 for step in NextStep}
+    for move in board.bounderies.get_moves(my_head):
+        areas[move.step] = calculate_reachable_area(
+            board, move.position, 1, vacating_turns, limit
+        )
+    return areas
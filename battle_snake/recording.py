@@ -0,0 +1,237 @@
+"""Recording of games played by the server and their replay.
+
+If the environment variable GAME_RECORDS_DIR is set, the server appends every
+/start, /move and /end request to a compressed file per game
+(<GAME_RECORDS_DIR>/<game id>.jsonl.gz), the moves together with the decision,
+the depth of the simulation, the tactic and the duration.
+
+Every record is a gzip member of its own, so the files are append-only and
+readable even if the server stopped in the middle of a game. The records are
+written by a background thread, so the requests don't wait for the disk; all
+records of a game are written at the latest when its /end request is recorded.
+
+Replay recorded games (a file or a directory of files) and show differences
+of the decisions and latencies:
+
+    python -m battle_snake.recording records/
+"""
+import argparse
+import atexit
+import gzip
+import json
+import logging
+import queue
+import re
+import statistics
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, Optional
+
+from battle_snake.interactor import (
+    TACTIC_LUCK,
+    UNLIMITED_TIME_BUDGET,
+    MoveDecision,
+    forget_game,
+)
+
+RECORD_SUFFIX = ".jsonl.gz"
+
+
+class GameRecorder:
+    """Appends the requests of the server to one compressed file per game.
+
+    The records are queued and written by a writer thread (started with the
+    first record, so within the server process that records). Pending records
+    are written on flush, on record_end and when the interpreter exits."""
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._queue: queue.Queue[Optional[tuple[Path, dict]]] = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        atexit.register(self.close)
+
+    def record_start(self, game_request: dict):
+        self._append(game_request, {"event": "start", "request": game_request})
+
+    def record_move(
+        self,
+        game_request: dict,
+        move_decision: MoveDecision,
+        move: str,
+        duration: float,
+    ):
+        """Record the request of a move and the decision (duration in seconds)."""
+        self._append(
+            game_request,
+            {
+                "event": "move",
+                "request": game_request,
+                "move": move,
+                "simulated_turns": move_decision.simulated_turns,
+                "tactic": move_decision.tactics.tactic,
+                "duration_ms": duration * 1000,
+            },
+        )
+
+    def record_end(self, game_request: dict):
+        self._append(game_request, {"event": "end", "request": game_request})
+        self.flush()
+
+    def flush(self):
+        """Wait until all records queued so far are written."""
+        self._queue.join()
+
+    def close(self):
+        """Write all pending records and stop the writer thread."""
+        with self._lock:
+            if self._writer is None:
+                return
+            self._queue.put(None)
+            self._writer.join()
+            self._writer = None
+
+    def get_path(self, game_id: str) -> Path:
+        return self.directory / (re.sub(r"[^\w.-]", "_", game_id) + RECORD_SUFFIX)
+
+    def _append(self, game_request: dict, record: dict):
+        path = self.get_path(game_request["game"]["id"])
+        with self._lock:
+            if self._writer is None:
+                self._writer = threading.Thread(
+                    target=self._write_records, name="GameRecorder", daemon=True
+                )
+                self._writer.start()
+            self._queue.put((path, record))
+
+    def _write_records(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                path, record = item
+                with gzip.open(path, "ab") as record_file:
+                    record_file.write(json.dumps(record).encode() + b"\n")
+            except Exception:
+                logging.exception("Failed to record a game")
+            finally:
+                self._queue.task_done()
+
+
+def read_records(path: Path) -> Iterator[dict]:
+    with gzip.open(path, "rb") as record_file:
+        for line in record_file:
+            yield json.loads(line)
+
+
+@dataclass
+class ReplayedMove:
+    turn: int
+    recorded_move: str
+    replayed_move: str
+    recorded_ms: float
+    replayed_ms: float
+    tactic: Optional[str]
+
+    @property
+    def is_different(self) -> bool:
+        return self.recorded_move != self.replayed_move
+
+    @property
+    def is_random(self) -> bool:
+        """Decided by luck, so a different decision is no surprise."""
+        return self.tactic == TACTIC_LUCK
+
+
+def replay_game(path: Path, with_deadline: bool = False) -> list[ReplayedMove]:
+    """Decide all recorded moves of the game again.
+
+    By default the simulation goes as deep as recorded (without deadline), so
+    the same decision is expected. With deadline, the simulation goes as deep
+    as the time budget of the request allows (like the server does)."""
+    replayed = []
+    game_id = None
+    for record in read_records(path):
+        if record["event"] != "move":
+            continue
+        game_request = record["request"]
+        game_id = game_request["game"]["id"]
+        start = time.perf_counter()
+        if with_deadline:
+            move_decision = MoveDecision(game_request)
+        else:
+            move_decision = MoveDecision(
+                game_request,
+                time_budget=UNLIMITED_TIME_BUDGET,
+                forecast_depth=record["simulated_turns"],
+            )
+        move = move_decision.decide().value
+        replayed.append(
+            ReplayedMove(
+                game_request.get("turn", len(replayed)),
+                record["move"],
+                move,
+                record["duration_ms"],
+                (time.perf_counter() - start) * 1000,
+                record["tactic"],
+            )
+        )
+    if game_id is not None:
+        forget_game(game_id)
+    return replayed
+
+
+def find_record_files(paths: list[Path]) -> list[Path]:
+    files = []
+    for path in paths:
+        if path.is_dir():
+            files.extend(sorted(path.glob("*" + RECORD_SUFFIX)))
+        else:
+            files.append(path)
+    return files
+
+
+def print_replay(path: Path, replayed: list[ReplayedMove]) -> int:
+    """Print the differences, return the amount of different decisions."""
+    differences = [move for move in replayed if move.is_different]
+    print(f"{path.name}: {len(replayed)} moves, {len(differences)} different")
+    for move in differences:
+        by_luck = " (by luck)" if move.is_random else ""
+        print(
+            f"  turn {move.turn:4}: {move.recorded_move:5} -> {move.replayed_move:5}"
+            f"{by_luck}"
+        )
+    if replayed:
+        recorded = [move.recorded_ms for move in replayed]
+        replayed_ms = [move.replayed_ms for move in replayed]
+        slowest = max(replayed, key=lambda move: move.recorded_ms)
+        print(
+            f"  latency median {statistics.median(recorded):.1f} -> "
+            f"{statistics.median(replayed_ms):.1f} ms, max {max(recorded):.1f} -> "
+            f"{max(replayed_ms):.1f} ms, slowest recorded: turn {slowest.turn}"
+        )
+    return len([move for move in differences if not move.is_random])
+
+
+def main(args: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Replay recorded games.")
+    parser.add_argument("paths", nargs="+", type=Path, help="files or directories")
+    parser.add_argument(
+        "--with-deadline",
+        action="store_true",
+        help="simulate as deep as the timeout allows instead of the recorded depth",
+    )
+    options = parser.parse_args(args)
+    differences = 0
+    for path in find_record_files(options.paths):
+        differences += print_replay(path, replay_game(path, options.with_deadline))
+    return 1 if differences else 0
+
+
+if __name__ == "__main__":
+    logging.getLogger().setLevel(logging.WARNING)
+    raise SystemExit(main())
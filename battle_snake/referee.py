@@ -0,0 +1,398 @@
+"""Local referee playing complete games with the standard Battlesnake rules.
+
+The snakes are played by MoveDecision in the same process or by a Battlesnake
+server over HTTP (e.g. the local Flask app). Many games are played in parallel
+by a pool of processes:
+
+    python -m battle_snake.referee --games 20 --snakes 4 --workers 4
+    python -m battle_snake.referee --games 20 --snakes 4 --url http://localhost:8080
+
+Rules of a turn (standard ruleset without hazards):
+1. Every snake moves its head one step and loses its tail. A snake that didn't
+   answer within the timeout (or whose server failed) repeats its last move.
+2. Every snake loses one point of health.
+3. A snake whose head is on food eats it: full health and one segment longer.
+4. New food is spawned (at least MINIMUM_FOOD items, otherwise by chance).
+5. Snakes are eliminated when out of health, out of the board, when they
+   bite any body or lose a head-to-head collision (the shorter snake loses,
+   both if they have the same length).
+"""
+import argparse
+import json
+import logging
+import random
+import socket
+import statistics
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Optional, Protocol
+
+from battle_snake.entities import GameBoardBounderies, NextStep, Position
+from battle_snake.interactor import MoveDecision, forget_game
+from battle_snake.scenarios import generate_move_request
+
+START_LENGTH = 3
+MAX_HEALTH = 100
+MINIMUM_FOOD = 1
+FOOD_SPAWN_CHANCE = 0.15
+# Time to wait for a server in addition to the timeout of the game (s)
+HTTP_TIMEOUT_SLACK = 1.0
+
+# Causes of elimination
+OUT_OF_HEALTH = "out-of-health"
+OUT_OF_BOUNDS = "wall-collision"
+SELF_COLLISION = "snake-self-collision"
+BODY_COLLISION = "snake-collision"
+HEAD_COLLISION = "head-collision"
+
+
+class Player(Protocol):
+    """A snake taking part in games of the referee."""
+
+    def start(self, game_request: dict):
+        ...
+
+    def move(self, game_request: dict) -> NextStep:
+        ...
+
+    def end(self, game_request: dict):
+        ...
+
+
+class InProcessPlayer:
+    """Snake played by MoveDecision within the process of the referee."""
+
+    def start(self, game_request: dict):
+        pass
+
+    def move(self, game_request: dict) -> NextStep:
+        return MoveDecision(game_request).decide()
+
+    def end(self, game_request: dict):
+        forget_game(game_request["game"]["id"])
+
+
+class HttpPlayer:
+    """Snake played by a Battlesnake server (e.g. the local Flask app)."""
+
+    def __init__(self, url: str):
+        self.url = url.rstrip("/")
+
+    def start(self, game_request: dict):
+        self._post("/start", game_request)
+
+    def move(self, game_request: dict) -> NextStep:
+        response = self._post("/move", game_request)
+        return NextStep(json.loads(response)["move"])
+
+    def end(self, game_request: dict):
+        self._post("/end", game_request)
+
+    def _post(self, path: str, game_request: dict) -> bytes:
+        http_request = urllib.request.Request(
+            self.url + path,
+            data=json.dumps(game_request).encode(),
+            headers={"Content-Type": "application/json"},
+        )
+        timeout = game_request["game"]["timeout"] / 1000 + HTTP_TIMEOUT_SLACK
+        with urllib.request.urlopen(http_request, timeout=timeout) as response:
+            return response.read()
+
+
+@dataclass
+class SnakeState:
+    id: str
+    body: list[Position]
+    health: int = MAX_HEALTH
+    last_move: NextStep = NextStep.UP
+    eliminated_by: Optional[str] = None
+
+    @property
+    def head(self) -> Position:
+        return self.body[0]
+
+
+@dataclass
+class GameResult:
+    turns: int
+    winner: Optional[str]
+    # Per snake: cause of elimination
+    eliminations: dict[str, str]
+    # Latencies of all moves of all snakes (ms)
+    latencies: list[float] = field(default_factory=list)
+    timeouts: int = 0
+
+
+class Game:
+    """One game between the players on a square board."""
+
+    def __init__(
+        self,
+        players: list[Player],
+        size: int = 11,
+        timeout: int = 500,
+        seed: int = 0,
+        max_turns: int = 1000,
+    ):
+        self.players = players
+        self.bounderies = GameBoardBounderies(size, size)
+        self.timeout = timeout
+        self.max_turns = max_turns
+        self.turn = 0
+        self._rng = random.Random(seed)
+        self._game_id = f"referee-{seed}-{self._rng.getrandbits(32):08x}"
+        start = generate_move_request(size, len(players), 1, 0, seed)
+        self.snakes: list[SnakeState] = [
+            SnakeState(
+                snake_data["id"], [self._to_position(snake_data["head"])] * START_LENGTH
+            )
+            for snake_data in start["board"]["snakes"]
+        ]
+        self.food: set[Position] = set()
+        self._spawn_food(len(players))
+
+    def play(self) -> GameResult:
+        result = GameResult(0, None, dict())
+        for player, snake in zip(self.players, self.snakes):
+            player.start(self.make_request(snake))
+        while not self.is_over():
+            self._play_turn(result)
+        for player, snake in zip(self.players, self.snakes):
+            player.end(self.make_request(snake))
+        survivors = self.get_survivors()
+        result.turns = self.turn
+        result.winner = survivors[0].id if len(survivors) == 1 else None
+        result.eliminations = {
+            snake.id: snake.eliminated_by
+            for snake in self.snakes
+            if snake.eliminated_by is not None
+        }
+        return result
+
+    def is_over(self) -> bool:
+        survivors = len(self.get_survivors())
+        last_survivor = 0 if len(self.snakes) == 1 else 1
+        return survivors <= last_survivor or self.turn >= self.max_turns
+
+    def get_survivors(self) -> list[SnakeState]:
+        return [snake for snake in self.snakes if snake.eliminated_by is None]
+
+    def make_request(self, snake: SnakeState) -> dict:
+        """Move request as sent by the Battlesnake engine to the snake."""
+        snakes_data = [self._make_snake_data(other) for other in self.get_survivors()]
+        you = self._make_snake_data(snake)
+        return {
+            "game": {
+                "id": self._game_id,
+                "ruleset": {"name": "standard", "version": "referee"},
+                "timeout": self.timeout,
+            },
+            "turn": self.turn,
+            "board": {
+                "height": self.bounderies.height,
+                "width": self.bounderies.width,
+                "food": [{"x": pos.x, "y": pos.y} for pos in self.food],
+                "hazards": [],
+                "snakes": snakes_data,
+            },
+            "you": you,
+        }
+
+    def _play_turn(self, result: GameResult):
+        moves: dict[str, NextStep] = dict()
+        for player, snake in zip(self.players, self.snakes):
+            if snake.eliminated_by is None:
+                moves[snake.id] = self._ask_for_move(player, snake, result)
+        self.apply_moves(moves)
+
+    def _ask_for_move(
+        self, player: Player, snake: SnakeState, result: GameResult
+    ) -> NextStep:
+        game_request = self.make_request(snake)
+        start = time.perf_counter()
+        try:
+            move: Optional[NextStep] = player.move(game_request)
+        except (socket.timeout, urllib.error.URLError) as error:
+            logging.warning(f"No move of {snake.id}: {error}")
+            move = None
+        latency = (time.perf_counter() - start) * 1000
+        result.latencies.append(latency)
+        if move is None or latency > self.timeout:
+            result.timeouts += 1
+            return snake.last_move
+        return move
+
+    def apply_moves(self, moves: dict[str, NextStep]):
+        """Play one turn with the moves of all snakes still alive."""
+        alive = self.get_survivors()
+        for snake in alive:
+            self._move(snake, moves[snake.id])
+        self._feed(alive)
+        self._spawn_food(0)
+        self._eliminate(alive)
+        self.turn += 1
+
+    def _move(self, snake: SnakeState, step: NextStep):
+        snake.last_move = step
+        new_head = self.bounderies.get_position_after_step(snake.head, step)
+        snake.health -= 1
+        if new_head is None:
+            snake.eliminated_by = OUT_OF_BOUNDS
+            return
+        snake.body = [new_head] + snake.body[:-1]
+
+    def _feed(self, alive: list[SnakeState]):
+        eaten = set()
+        for snake in alive:
+            if snake.eliminated_by is None and snake.head in self.food:
+                snake.health = MAX_HEALTH
+                snake.body.append(snake.body[-1])
+                eaten.add(snake.head)
+        self.food -= eaten
+
+    def _spawn_food(self, extra_food: int):
+        amount = max(MINIMUM_FOOD - len(self.food), extra_food)
+        if amount == 0 and self._rng.random() < FOOD_SPAWN_CHANCE:
+            amount = 1
+        occupied = {pos for snake in self.get_survivors() for pos in snake.body}
+        free = [
+            pos
+            for pos in self.bounderies.move_table.positions
+            if pos not in occupied and pos not in self.food
+        ]
+        self.food.update(self._rng.sample(free, min(amount, len(free))))
+
+    def _eliminate(self, alive: list[SnakeState]):
+        for snake in alive:
+            if snake.eliminated_by is None and snake.health <= 0:
+                snake.eliminated_by = OUT_OF_HEALTH
+        candidates = [snake for snake in alive if snake.eliminated_by is None]
+        causes = {
+            snake.id: self._find_collision(snake, candidates) for snake in candidates
+        }
+        for snake in candidates:
+            snake.eliminated_by = causes[snake.id]
+
+    def _find_collision(
+        self, snake: SnakeState, candidates: list[SnakeState]
+    ) -> Optional[str]:
+        if snake.head in snake.body[1:]:
+            return SELF_COLLISION
+        for other in candidates:
+            if other is not snake and snake.head in other.body[1:]:
+                return BODY_COLLISION
+        for other in candidates:
+            if (
+                other is not snake
+                and snake.head == other.head
+                and len(snake.body) <= len(other.body)
+            ):
+                return HEAD_COLLISION
+        return None
+
+    def _make_snake_data(self, snake: SnakeState) -> dict:
+        body = [{"x": pos.x, "y": pos.y} for pos in snake.body]
+        return {
+            "id": snake.id,
+            "name": snake.id,
+            "health": snake.health,
+            "body": body,
+            "latency": "0",
+            "head": body[0],
+            "length": len(body),
+            "shout": "",
+        }
+
+    def _to_position(self, point: dict) -> Position:
+        return self.bounderies.get_position(point["x"], point["y"])
+
+
+def play_game(
+    seed: int,
+    snakes: int = 4,
+    urls: tuple[str, ...] = (),
+    size: int = 11,
+    timeout: int = 500,
+    max_turns: int = 1000,
+) -> GameResult:
+    """Play one game. The first snakes are played over HTTP (one per URL)."""
+    players: list[Player] = [HttpPlayer(url) for url in urls]
+    players += [InProcessPlayer() for _ in range(snakes - len(players))]
+    return Game(players, size, timeout, seed, max_turns).play()
+
+
+def play_games(
+    games: int, workers: int = 1, seed: int = 0, **game_options
+) -> tuple[list[GameResult], float]:
+    """Play the games in parallel, return their results and the duration (s)."""
+    start = time.perf_counter()
+    seeds = range(seed, seed + games)
+    if workers < 2:
+        results = [play_game(game_seed, **game_options) for game_seed in seeds]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(play_game, game_seed, **game_options) for game_seed in seeds
+            ]
+            results = [future.result() for future in futures]
+    return results, time.perf_counter() - start
+
+
+def summarize(results: list[GameResult], duration: float) -> dict:
+    latencies = sorted(
+        latency for result in results for latency in result.latencies
+    ) or [0.0]
+    turns = sum(result.turns for result in results)
+    return {
+        "games": len(results),
+        "turns": turns,
+        "turns_per_second": turns / duration if duration else 0.0,
+        "moves": sum(len(result.latencies) for result in results),
+        "latency_median_ms": statistics.median(latencies),
+        "latency_p95_ms": latencies[max(round(0.95 * len(latencies)), 1) - 1],
+        "latency_max_ms": latencies[-1],
+        "timeouts": sum(result.timeouts for result in results),
+        "draws": sum(result.winner is None for result in results),
+    }
+
+
+def main(args: Optional[list[str]] = None):
+    parser = argparse.ArgumentParser(description="Play local Battlesnake games.")
+    parser.add_argument("--games", type=int, default=10)
+    parser.add_argument("--snakes", type=int, default=4)
+    parser.add_argument(
+        "--url",
+        action="append",
+        default=[],
+        help="server playing one of the snakes over HTTP (repeatable)",
+    )
+    parser.add_argument("--size", type=int, default=11)
+    parser.add_argument("--timeout", type=int, default=500, help="per move (ms)")
+    parser.add_argument("--max-turns", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=1, help="processes")
+    parser.add_argument("--seed", type=int, default=0)
+    options = parser.parse_args(args)
+    results, duration = play_games(
+        options.games,
+        options.workers,
+        options.seed,
+        snakes=max(options.snakes, len(options.url)),
+        urls=tuple(options.url),
+        size=options.size,
+        timeout=options.timeout,
+        max_turns=options.max_turns,
+    )
+    for name, value in summarize(results, duration).items():
+        print(
+            f"{name:20} {value:.1f}"
+            if isinstance(value, float)
+            else f"{name:20} {value}"
+        )
+
+
+if __name__ == "__main__":
+    logging.getLogger().setLevel(logging.WARNING)
+    main()
@@ -0,0 +1,52 @@
+"""Fast parser of the requests sent by the Battlesnake engine.
+
+The JSON is decoded by orjson, if it's installed (pip install orjson), otherwise
+by the json module of the standard library. The Board is built directly from
+the decoded data: the positions are looked up in the MoveTable of the board
+size instead of creating Positions from keyword arguments.
+"""
+import json
+from typing import Callable, Union
+
+from battle_snake.entities import Board, GameBoardBounderies, Position, Snake
+
+try:
+    import orjson
+
+    loads: Callable[[Union[bytes, str]], dict] = orjson.loads
+except ImportError:  # pragma: no cover - depends on the installed packages
+    loads = json.loads
+
+
+def parse_move_request(raw_request: Union[bytes, str]) -> tuple[dict, Board]:
+    """Decode the request of a move and build the board."""
+    game_request = loads(raw_request)
+    return game_request, parse_board(game_request)
+
+
+def parse_board(game_request: dict) -> Board:
+    """Board of the (decoded) request, same as Board.from_dict but faster."""
+    board_data: dict = game_request["board"]
+    width: int = board_data["width"]
+    height: int = board_data["height"]
+    bounderies = GameBoardBounderies(height, width)
+    positions = bounderies.move_table.positions
+
+    def to_positions(points: list[dict]) -> list[Position]:
+        return [
+            positions[point["y"] * width + point["x"]]
+            if 0 <= point["x"] < width and 0 <= point["y"] < height
+            else Position(point["x"], point["y"])
+            for point in points
+        ]
+
+    my_head = game_request["you"]["head"]
+    my_head_pos = to_positions([my_head])[0]
+    snakes: set[Snake] = set()
+    for snake_data in board_data["snakes"]:
+        head_and_body = to_positions(snake_data["body"])
+        snakes.add(
+            Snake(head_and_body, head_and_body[0] == my_head_pos, bounderies=bounderies)
+        )
+    food = set(to_positions(board_data["food"]))
+    return Board(bounderies, food, snakes)
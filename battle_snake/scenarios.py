@@ -0,0 +1,188 @@
+"""Generator of synthetic move requests (scenarios) for benchmarks and tests.
+
+The requests look like the ones of the Battlesnake engine, so they can be
+given to MoveDecision directly:
+
+    MoveDecision(generate_move_request(size=19, snakes=8, seed=1)).decide()
+
+Write a grid of scenarios as JSON files (e.g. for snake_profile/benchmark.py):
+
+    python -m battle_snake.scenarios --sizes 7 11 19 25 --snakes 1 4 8 --output-dir scenarios
+"""
+import argparse
+import itertools
+import json
+import random
+from pathlib import Path
+from typing import Iterable, Optional
+
+# Attempts to place a snake (and all snakes) on the board before giving up
+MAX_ATTEMPTS = 100
+
+
+def generate_move_request(
+    size: int = 11,
+    snakes: int = 4,
+    snake_length: int = 5,
+    food_density: float = 0.05,
+    seed: int = 0,
+    height: Optional[int] = None,
+) -> dict:
+    """Valid move request of a random board, the same for the same arguments.
+
+    All snakes have the given length and don't overlap (neither with themselves
+    nor with each other). The first snake is mine ("you"). The amount of food
+    is the share (food_density) of the free cells, at least one item.
+    Raises ValueError, if the snakes don't fit onto the board.
+    """
+    width = size
+    height = height or size
+    rng = random.Random(seed)
+    for _ in range(MAX_ATTEMPTS if snakes * snake_length <= width * height else 0):
+        bodies = _place_snakes(rng, width, height, snakes, snake_length)
+        if bodies is not None:
+            break
+    else:
+        raise ValueError(
+            f"{snakes} snakes of length {snake_length} don't fit onto {width}x{height}"
+        )
+    occupied = set(itertools.chain.from_iterable(bodies))
+    free_cells = [
+        (x, y) for x in range(width) for y in range(height) if (x, y) not in occupied
+    ]
+    amount_of_food = min(max(round(food_density * len(free_cells)), 1), len(free_cells))
+    food = rng.sample(free_cells, amount_of_food)
+    snakes_data = [
+        _make_snake_data(f"snake-{index}", body, rng)
+        for index, body in enumerate(bodies)
+    ]
+    return {
+        "game": {
+            "id": f"scenario-{width}x{height}-{snakes}-{snake_length}-{seed}",
+            "ruleset": {"name": "standard", "version": "v1.0.0"},
+            "timeout": 500,
+        },
+        "turn": snake_length * 5,
+        "board": {
+            "height": height,
+            "width": width,
+            "food": [_to_point(cell) for cell in food],
+            "hazards": [],
+            "snakes": snakes_data,
+        },
+        "you": snakes_data[0],
+    }
+
+
+def generate_scenarios(
+    sizes: Iterable[int] = (7, 11, 19, 25),
+    snake_counts: Iterable[int] = (1, 4, 8),
+    snake_lengths: Iterable[int] = (5,),
+    food_densities: Iterable[float] = (0.05,),
+    seed: int = 0,
+) -> dict[str, dict]:
+    """Move requests for all combinations of the parameters, that fit onto the board.
+
+    The names tell the parameters: size_snakes_length_food (food in percent)."""
+    scenarios: dict[str, dict] = dict()
+    for size, snakes, length, food_density in itertools.product(
+        sizes, snake_counts, snake_lengths, food_densities
+    ):
+        food_percent = round(food_density * 100)
+        name = f"{size}x{size}_{snakes}_snakes_{length}_long_{food_percent}pct_food"
+        try:
+            scenarios[name] = generate_move_request(
+                size, snakes, length, food_density, seed
+            )
+        except ValueError:
+            continue
+    return scenarios
+
+
+def _place_snakes(
+    rng: random.Random, width: int, height: int, snakes: int, snake_length: int
+) -> Optional[list[list[tuple[int, int]]]]:
+    occupied: set[tuple[int, int]] = set()
+    bodies = []
+    for _ in range(snakes):
+        for _ in range(MAX_ATTEMPTS):
+            body = _place_snake(rng, width, height, snake_length, occupied)
+            if body is not None:
+                break
+        else:
+            return None
+        occupied.update(body)
+        bodies.append(body)
+    return bodies
+
+
+def _place_snake(
+    rng: random.Random,
+    width: int,
+    height: int,
+    snake_length: int,
+    occupied: set[tuple[int, int]],
+) -> Optional[list[tuple[int, int]]]:
+    """Random walk from the head to the tail over free cells."""
+    free_cells = [
+        (x, y) for x in range(width) for y in range(height) if (x, y) not in occupied
+    ]
+    if not free_cells:
+        return None
+    body = [rng.choice(free_cells)]
+    while len(body) < snake_length:
+        x, y = body[-1]
+        neighbors = [
+            (nx, ny)
+            for nx, ny in ((x, y + 1), (x, y - 1), (x - 1, y), (x + 1, y))
+            if 0 <= nx < width
+            and 0 <= ny < height
+            and (nx, ny) not in occupied
+            and (nx, ny) not in body
+        ]
+        if not neighbors:
+            return None
+        body.append(rng.choice(neighbors))
+    return body
+
+
+def _make_snake_data(
+    snake_id: str, body: list[tuple[int, int]], rng: random.Random
+) -> dict:
+    points = [_to_point(cell) for cell in body]
+    return {
+        "id": snake_id,
+        "name": snake_id,
+        "health": rng.randint(50, 100),
+        "body": points,
+        "latency": "0",
+        "head": points[0],
+        "length": len(points),
+        "shout": "",
+    }
+
+
+def _to_point(cell: tuple[int, int]) -> dict:
+    return {"x": cell[0], "y": cell[1]}
+
+
+def main(args: Optional[list[str]] = None):
+    parser = argparse.ArgumentParser(description="Generate move requests.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[7, 11, 19, 25])
+    parser.add_argument("--snakes", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--lengths", type=int, nargs="+", default=[5])
+    parser.add_argument("--food", type=float, nargs="+", default=[0.05])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output-dir", type=Path, default=Path("scenarios"))
+    options = parser.parse_args(args)
+    options.output_dir.mkdir(parents=True, exist_ok=True)
+    scenarios = generate_scenarios(
+        options.sizes, options.snakes, options.lengths, options.food, options.seed
+    )
+    for name, game_request in scenarios.items():
+        (options.output_dir / f"{name}.json").write_text(json.dumps(game_request))
+    print(f"{len(scenarios)} scenarios written to {options.output_dir}")
+
+
+if __name__ == "__main__":
+    main()
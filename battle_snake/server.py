@@ -0,0 +1,130 @@
+import os
+import time
+
+from flask import Flask, request
+
+from battle_snake import metrics
+from battle_snake.entities import get_move_table
+from battle_snake.interactor import (
+    MoveDecision,
+    create_simulation_pool,
+    forget_game,
+    get_info,
+)
+from battle_snake.recording import GameRecorder
+from battle_snake.request_parser import parse_move_request
+
+app = Flask(__name__)
+# Created per server process by init_simulation_pool, if SIMULATION_WORKERS is set
+simulation_pool = None
+# Records all games, if GAME_RECORDS_DIR is set (see recording)
+game_recorder = (
+    GameRecorder(os.environ["GAME_RECORDS_DIR"])
+    if os.environ.get("GAME_RECORDS_DIR")
+    else None
+)
+# Board sizes of the standard game modes
+COMMON_BOARD_SIZES = (7, 11, 19)
+
+
+@app.get("/")
+def handle_info():
+    """
+    This function is called when you register your Battlesnake on play.battlesnake.com
+    See https://docs.battlesnake.com/guides/getting-started#step-4-register-your-battlesnake
+    """
+    print("INFO")
+    return get_info()
+
+
+@app.post("/start")
+def handle_start():
+    """
+    This function is called everytime your Battlesnake enters a game.
+    It's purely for informational purposes, you don't have to make any decisions here.
+    request.json contains information about the game that's about to be played.
+    """
+    data: dict = request.get_json()  # type: ignore
+
+    print(f"{data['game']['id']} START")
+    if game_recorder:
+        game_recorder.record_start(data)
+    return "ok"
+
+
+@app.post("/move")
+def handle_move():
+    """
+    This function is called on every turn and is how your Battlesnake decides where to move.
+    Valid moves are "up", "down", "left", or "right".
+    """
+    start = time.perf_counter()
+    data, board = parse_move_request(request.get_data())
+    move_decision = MoveDecision(data, executor=simulation_pool, board=board)
+    decision = move_decision.decide()
+    duration = time.perf_counter() - start
+    metrics.observe_move(move_decision, duration)
+    if game_recorder:
+        game_recorder.record_move(data, move_decision, decision.value, duration)
+
+    return {"move": decision.value}
+
+
+@app.post("/end")
+def handle_end():
+    """
+    This function is called when a game your Battlesnake was in has ended.
+    It's purely for informational purposes, you don't have to make any decisions here.
+    """
+    data = request.get_json()
+
+    print(f"{data['game']['id']} END")  # type: ignore
+    forget_game(data["game"]["id"])  # type: ignore
+    if game_recorder:
+        game_recorder.record_end(data)  # type: ignore
+    return "ok"
+
+
+@app.get("/metrics")
+def handle_metrics():
+    """Metrics of the decisions of this server process for Prometheus."""
+    return metrics.render(), {"Content-Type": "text/plain; version=0.0.4"}
+
+
+@app.after_request
+def identify_server(response):
+    response.headers["Server"] = "BattlesnakeOfficial/starter-snake-python"
+    return response
+
+
+def init_simulation_pool():
+    """Create the pool of simulation processes (once per server process)."""
+    global simulation_pool
+    simulation_pool = create_simulation_pool(
+        int(os.environ.get("SIMULATION_WORKERS", "0"))
+    )
+
+
+def warm_up():
+    """Do all the one-time work before the first game arrives.
+
+    Builds the tables for the common board sizes and runs one decision."""
+    for size in COMMON_BOARD_SIZES:
+        get_move_table(size, size)
+    warm_up_request = _make_warm_up_request()
+    MoveDecision(warm_up_request).decide()
+    forget_game(warm_up_request["game"]["id"])
+
+
+def _make_warm_up_request() -> dict:
+    body = [{"x": 5, "y": 5}, {"x": 5, "y": 4}, {"x": 5, "y": 3}]
+    return {
+        "game": {"id": "warm-up", "timeout": 500},
+        "board": {
+            "height": 11,
+            "width": 11,
+            "food": [{"x": 2, "y": 8}],
+            "snakes": [{"id": "me", "body": body, "head": body[0]}],
+        },
+        "you": {"id": "me", "body": body, "head": body[0]},
+    }
@@ -0,0 +1,278 @@
+"""FutureBoard based on NumPy arrays.
+
+NumPy is an optional dependency (install it with: pip install numpy).
+Select the engine with:
+
+    MoveDecision(game_request, future_board_engine=VectorizedPossibleFutureBoard)
+"""
+from typing import Iterator, Optional
+
+import numpy as np
+
+from battle_snake.entities import (
+    OFF_BOARD,
+    Board,
+    FutureBoard,
+    NextStep,
+    Position,
+)
+
+STEPS: tuple[NextStep, ...] = tuple(NextStep)
+EMPTY_CELL = -1
+NO_FIRST_STEP = -1
+
+
+class VectorizedVariant:
+    """One variant of a snake on the VectorizedPossibleFutureBoard.
+
+    Offers the part of the FutureSnake interface, that is needed by
+    MoveDecision and MyFutureHistory."""
+
+    __slots__ = ("id", "head", "is_me", "multiplicity", "_length", "_my_first_step")
+
+    def __init__(
+        self,
+        snake_id: Position,
+        head: Position,
+        length: int,
+        my_first_step: NextStep,
+        multiplicity: int,
+        is_me: bool = True,
+    ):
+        self.id = snake_id
+        self.head = head
+        self.is_me = is_me
+        self.multiplicity = multiplicity
+        self._length = length
+        self._my_first_step = my_first_step
+
+    def get_my_first_step(self) -> NextStep:
+        return self._my_first_step
+
+    def __len__(self):
+        return self._length
+
+    def __repr__(self) -> str:
+        return f"VectorizedVariant: ID={self.id}, HEAD={self.head}"
+
+
+class VectorizedPossibleFutureBoard(FutureBoard):
+    """Simulate Board as it could look like in the future - all variants at once.
+
+    Same rules and same results as the PossibleFutureBoard, but all variants of
+    all snakes are rows of NumPy arrays (cells are numbered like in the MoveTable):
+
+    - bodies: cells of head and body, EMPTY_CELL behind the tail
+    - lengths, snake indices, first steps (index of STEPS) and multiplicities
+
+    Every next_turn expands all variants into all four directions in one go.
+    Walls, biting itself and biting the deterministic part of other snakes are
+    filtered by boolean masks, equal variants are merged by np.unique.
+    The variants are available as VectorizedVariant objects (created on demand).
+    """
+
+    def __init__(
+        self,
+        board: Board,
+        my_first_steps: Optional[set[NextStep]] = None,
+        max_variants_per_snake: Optional[int] = None,
+    ):
+        self.bounderies = board.bounderies
+        self._my_first_steps = my_first_steps
+        self._max_variants_per_snake = max_variants_per_snake
+        self.pruned_variants_per_turn: list[int] = []
+        self.recorder = None
+        self.simulated_turns = 1
+        move_table = self.bounderies.move_table
+        self._positions: list[Position] = move_table.positions
+        self._neighbors = np.array(
+            [[neighbors[step] for step in STEPS] for neighbors in move_table.neighbors],
+            dtype=np.int32,
+        )
+        self._food = np.zeros(len(self._positions), dtype=bool)
+        self._food[[self.bounderies.cell_index(pos) for pos in board.food]] = True
+        self._my_head_cell = self.bounderies.cell_index(board.my_snake.head)
+        self._init_variants_with(list(board.snakes))
+        self._my_survived_snakes: Optional[set[VectorizedVariant]] = None
+        self._other_snakes_cells: Optional[tuple[np.ndarray, np.ndarray]] = None
+        self._prepare_future_board(is_first_step=True)
+
+    def _init_variants_with(self, snakes: list):
+        self._snake_ids: list[Position] = [snake.id for snake in snakes]
+        self._my_snake_index: int = [snake.is_me for snake in snakes].index(True)
+        width = max(len(snake) for snake in snakes)
+        self._bodies = np.full((len(snakes), width), EMPTY_CELL, dtype=np.int32)
+        for row, snake in enumerate(snakes):
+            cells = [self.bounderies.cell_index(pos) for pos in snake.head_and_body]
+            self._bodies[row, : len(cells)] = cells
+        self._lengths = np.array([len(snake) for snake in snakes], dtype=np.int32)
+        self._snake_indices = np.arange(len(snakes), dtype=np.int32)
+        self._first_steps = np.full(len(snakes), NO_FIRST_STEP, dtype=np.int32)
+        self._multiplicities = np.ones(len(snakes), dtype=np.int64)
+
+    @property
+    def food(self) -> set[Position]:
+        return {self._positions[cell] for cell in np.flatnonzero(self._food)}
+
+    def _prepare_future_board(self, is_first_step: bool = False):
+        self._add_possible_snakes_of_future(is_first_step)
+        self._merge_equal_variants()
+        self._remove_snakes_biting_other_snakes()
+        if self._max_variants_per_snake is not None:
+            self._prune_variants_of_other_snakes(self._max_variants_per_snake)
+        self._my_survived_snakes = None
+        self._other_snakes_cells = None
+
+    def _add_possible_snakes_of_future(self, is_first_step: bool):
+        heads = self._bodies[:, 0]
+        future_heads = self._neighbors[heads]
+        is_possible = future_heads != OFF_BOARD
+        if is_first_step and self._my_first_steps is not None:
+            is_possible[self._my_snake_index] &= [
+                step in self._my_first_steps for step in STEPS
+            ]
+        mothers, steps = np.nonzero(is_possible)
+        future_heads = future_heads[mothers, steps]
+        has_food = self._food[heads][mothers]
+        mother_lengths = self._lengths[mothers]
+        is_growing = has_food | (mother_lengths < 3)
+        lengths = mother_lengths + is_growing
+        bodies = np.empty((len(mothers), self._bodies.shape[1] + 1), dtype=np.int32)
+        bodies[:, 0] = future_heads
+        bodies[:, 1:] = self._bodies[mothers]
+        columns = np.arange(bodies.shape[1])
+        bodies[columns >= lengths[:, None]] = EMPTY_CELL
+        bites_itself = (bodies[:, 1:] == future_heads[:, None]).any(axis=1)
+        survivors = ~bites_itself
+        self._bodies = bodies[survivors, : lengths.max(initial=1)]
+        self._lengths = lengths[survivors]
+        self._snake_indices = self._snake_indices[mothers][survivors]
+        if is_first_step:
+            self._first_steps = steps.astype(np.int32)[survivors]
+        else:
+            self._first_steps = self._first_steps[mothers][survivors]
+        self._multiplicities = self._multiplicities[mothers][survivors]
+
+    def _merge_equal_variants(self):
+        # The first step is only relevant for my own snake (see FutureSnake.state_key)
+        first_steps = np.where(
+            self._snake_indices == self._my_snake_index,
+            self._first_steps,
+            NO_FIRST_STEP,
+        )
+        keys = np.column_stack((self._snake_indices, first_steps, self._bodies))
+        _, kept_rows, merged_into = np.unique(
+            keys, axis=0, return_index=True, return_inverse=True
+        )
+        self._multiplicities = np.bincount(
+            merged_into.ravel(),
+            weights=self._multiplicities,
+            minlength=len(kept_rows),
+        ).astype(np.int64)
+        self._bodies = self._bodies[kept_rows]
+        self._lengths = self._lengths[kept_rows]
+        self._snake_indices = self._snake_indices[kept_rows]
+        self._first_steps = self._first_steps[kept_rows]
+
+    def _remove_snakes_biting_other_snakes(self):
+        deterministic_parts = self._bodies[:, self.simulated_turns :]
+        is_body = deterministic_parts != EMPTY_CELL
+        snake_indices = np.broadcast_to(
+            self._snake_indices[:, None], deterministic_parts.shape
+        )
+        occupied = np.zeros((len(self._snake_ids), len(self._positions)), dtype=bool)
+        occupied[snake_indices[is_body], deterministic_parts[is_body]] = True
+        heads = self._bodies[:, 0]
+        occupied_by_others = (
+            occupied[:, heads].sum(axis=0) - occupied[self._snake_indices, heads]
+        )
+        self._keep_variants(occupied_by_others == 0)
+
+    def _prune_variants_of_other_snakes(self, max_variants: int):
+        # Same order as PossibleFutureBoard: nearest to my snake, most paths,
+        # body (the rows are sorted by body already, lexsort is stable)
+        width = self.bounderies.width
+        heads = self._bodies[:, 0]
+        my_x, my_y = self._my_head_cell % width, self._my_head_cell // width
+        distances = np.abs(heads % width - my_x) + np.abs(heads // width - my_y)
+        order = np.lexsort((-self._multiplicities, distances, self._snake_indices))
+        sorted_indices = self._snake_indices[order]
+        group_starts = np.searchsorted(sorted_indices, sorted_indices, side="left")
+        ranks = np.empty(len(order), dtype=np.int64)
+        ranks[order] = np.arange(len(order)) - group_starts
+        survivors = (ranks < max_variants) | (
+            self._snake_indices == self._my_snake_index
+        )
+        self.pruned_variants_per_turn.append(int(len(survivors) - survivors.sum()))
+        self._keep_variants(survivors)
+
+    def _keep_variants(self, survivors: np.ndarray):
+        self._bodies = self._bodies[survivors]
+        self._lengths = self._lengths[survivors]
+        self._snake_indices = self._snake_indices[survivors]
+        self._first_steps = self._first_steps[survivors]
+        self._multiplicities = self._multiplicities[survivors]
+
+    def is_food_available_for(self, snake) -> bool:
+        return bool(self._food[self.bounderies.cell_index(snake.head)])
+
+    def _make_variant(self, row: int) -> VectorizedVariant:
+        snake_index = self._snake_indices[row]
+        return VectorizedVariant(
+            self._snake_ids[snake_index],
+            self._positions[self._bodies[row, 0]],
+            int(self._lengths[row]),
+            STEPS[self._first_steps[row]],
+            int(self._multiplicities[row]),
+            is_me=snake_index == self._my_snake_index,
+        )
+
+    @property
+    def possible_snakes(self) -> set[VectorizedVariant]:
+        """Variants of all snakes (a new set)."""
+        return {self._make_variant(row) for row in range(len(self._lengths))}
+
+    def get_my_survived_snakes(self) -> set[VectorizedVariant]:
+        if self._my_survived_snakes is None:
+            self._my_survived_snakes = {
+                self._make_variant(row)
+                for row in np.flatnonzero(self._snake_indices == self._my_snake_index)
+            }
+        return self._my_survived_snakes
+
+    def get_variants_of_other_snakes(self) -> Iterator[VectorizedVariant]:
+        for row in np.flatnonzero(self._snake_indices != self._my_snake_index):
+            yield self._make_variant(row)
+
+    def count_my_survived_snakes(self) -> int:
+        is_mine = self._snake_indices == self._my_snake_index
+        return int(self._multiplicities[is_mine].sum())
+
+    def count_variants(self) -> int:
+        return len(self._lengths)
+
+    def next_turn(self) -> None:
+        self._food[self._bodies[:, 0]] = False
+        self._prepare_future_board()
+        self.simulated_turns += 1
+        if self.recorder:
+            self.recorder.save(self)
+
+    def does_my_snake_bite_or_collide_with_another_snake(self, my_snake) -> bool:
+        assert my_snake.is_me
+        head = self.bounderies.cell_index(my_snake.head)
+        other_bodies, longest_other_heads = self._get_other_snakes_cells()
+        return bool(other_bodies[head] or len(my_snake) <= longest_other_heads[head])
+
+    def _get_other_snakes_cells(self) -> tuple[np.ndarray, np.ndarray]:
+        if self._other_snakes_cells is None:
+            others = self._snake_indices != self._my_snake_index
+            other_bodies = np.zeros(len(self._positions), dtype=bool)
+            bodies_without_head = self._bodies[others, 1:]
+            other_bodies[bodies_without_head[bodies_without_head != EMPTY_CELL]] = True
+            longest_other_heads = np.zeros(len(self._positions), dtype=np.int32)
+            np.maximum.at(
+                longest_other_heads, self._bodies[others, 0], self._lengths[others]
+            )
+            self._other_snakes_cells = (other_bodies, longest_other_heads)
+        return self._other_snakes_cells
@@ -0,0 +1,202 @@
+"""Benchmark of MoveDecision over a set of scenarios (move requests).
+
+Every scenario is decided several times and reported with:
+- min / median / p95 latency of the whole decision (ms)
+- variants of all snakes after every simulated turn
+- peak memory allocated during one decision (KiB, measured by tracemalloc
+  in an extra run, because tracing slows everything down)
+
+By default the simulation isn't limited by time, but by depth only (--depth),
+so the same work is measured in every run. Use --time-budget-ms to measure
+the deadline driven behaviour of the server instead.
+
+Results are stored as JSON (--output) and can be compared with the results
+of an earlier run (--baseline): a scenario whose median got slower by more
+than --threshold (relative) is a regression and the exit code is 1 then.
+
+Generated scenarios (see battle_snake.scenarios) are added with --generated.
+
+Run as module from the root of the repository (so battle_snake is found):
+
+    python -m snake_profile.benchmark --output results.json
+    python -m snake_profile.benchmark --baseline results.json --threshold 0.1
+"""
+import argparse
+import json
+import logging
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Iterable, Optional
+
+from battle_snake import interactor
+from battle_snake.interactor import UNLIMITED_TIME_BUDGET, MoveDecision, forget_game
+from battle_snake.scenarios import generate_scenarios
+
+TESTS_DIR = Path(__file__).parent.parent / "tests"
+
+
+def load_scenarios(paths: Iterable[Path]) -> dict[str, dict]:
+    """Move requests of all JSON files (directories are searched for *.json)."""
+    scenarios: dict[str, dict] = dict()
+    for path in paths:
+        files = sorted(path.glob("*.json")) if path.is_dir() else [path]
+        for file in files:
+            scenarios[file.stem] = json.loads(file.read_text())
+    return scenarios
+
+
+def decide(game_request: dict, time_budget: int) -> MoveDecision:
+    move_decision = MoveDecision(game_request, time_budget=time_budget)
+    move_decision.decide()
+    forget_game(game_request.get("game", {}).get("id"))
+    return move_decision
+
+
+def run_scenario(game_request: dict, repeat: int, time_budget: int) -> dict:
+    move_decision = decide(game_request, time_budget)  # warm up
+    latencies: list[float] = []
+    for _ in range(repeat):
+        start = time.perf_counter_ns()
+        decide(game_request, time_budget)
+        latencies.append((time.perf_counter_ns() - start) / 1e6)
+    tracemalloc.start()
+    decide(game_request, time_budget)
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "min_ms": min(latencies),
+        "median_ms": statistics.median(latencies),
+        "p95_ms": percentile(latencies, 95),
+        "simulated_turns": move_decision.future_board.simulated_turns,
+        "variants_per_turn": move_decision.variants_per_turn,
+        "pruned_per_turn": move_decision.future_board.pruned_variants_per_turn,
+        "peak_memory_kib": peak_memory / 1024,
+    }
+
+
+def percentile(values: list[float], percent: int) -> float:
+    """Nearest-rank percentile."""
+    ordered = sorted(values)
+    rank = max(round(percent / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    """Scenarios whose median latency got worse by more than the threshold."""
+    regressions = []
+    for name, result in results["scenarios"].items():
+        base = baseline["scenarios"].get(name)
+        if base is None:
+            continue
+        change = result["median_ms"] / base["median_ms"] - 1
+        marker = "REGRESSION" if change > threshold else ""
+        print(
+            f"{name:40} {base['median_ms']:9.2f} -> {result['median_ms']:9.2f} ms"
+            f" ({change:+7.1%}) {marker}"
+        )
+        if change > threshold:
+            regressions.append(name)
+    return regressions
+
+
+def print_results(results: dict):
+    print(
+        f"{'scenario':40} {'min':>9} {'median':>9} {'p95':>9} {'KiB':>9}  variants per turn"
+    )
+    for name, result in results["scenarios"].items():
+        print(
+            f"{name:40} {result['min_ms']:9.2f} {result['median_ms']:9.2f}"
+            f" {result['p95_ms']:9.2f} {result['peak_memory_kib']:9.0f}"
+            f"  {result['variants_per_turn']}"
+        )
+
+
+def parse_args(args: Optional[list[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark of MoveDecision.")
+    parser.add_argument(
+        "scenarios",
+        nargs="*",
+        type=Path,
+        default=[TESTS_DIR],
+        help="JSON files with move requests or directories of them (default: tests)",
+    )
+    parser.add_argument(
+        "--generated",
+        action="store_true",
+        help="add generated scenarios (board sizes 7 to 25, 1 to 8 snakes)",
+    )
+    parser.add_argument("--repeat", type=int, default=20, help="runs per scenario")
+    parser.add_argument(
+        "--depth",
+        type=int,
+        default=8,
+        help="maximum depth of the simulation (FORECAST_DEPTH)",
+    )
+    parser.add_argument(
+        "--time-budget-ms",
+        type=int,
+        default=None,
+        help="time budget of every decision (default: no limit)",
+    )
+    parser.add_argument(
+        "--max-variants-per-snake",
+        type=int,
+        default=None,
+        help="prune variants of other snakes (MAX_VARIANTS_PER_SNAKE)",
+    )
+    parser.add_argument("--output", type=Path, help="store the results as JSON")
+    parser.add_argument("--baseline", type=Path, help="results to compare with")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="relative slowdown of the median counted as regression (default: 0.1)",
+    )
+    return parser.parse_args(args)
+
+
+def main(args: Optional[list[str]] = None) -> int:
+    options = parse_args(args)
+    interactor.FORECAST_DEPTH = options.depth
+    interactor.MAX_VARIANTS_PER_SNAKE = options.max_variants_per_snake
+    time_budget = (
+        UNLIMITED_TIME_BUDGET
+        if options.time_budget_ms is None
+        else options.time_budget_ms * 1_000_000
+    )
+    scenarios = load_scenarios(options.scenarios)
+    if options.generated:
+        scenarios.update(generate_scenarios())
+    results = {
+        "meta": {
+            "python": platform.python_version(),
+            "engine": interactor.FUTURE_BOARD_ENGINE.__name__,
+            "depth": options.depth,
+            "repeat": options.repeat,
+            "time_budget_ms": options.time_budget_ms,
+            "max_variants_per_snake": options.max_variants_per_snake,
+        },
+        "scenarios": {
+            name: run_scenario(game_request, options.repeat, time_budget)
+            for name, game_request in scenarios.items()
+        },
+    }
+    print_results(results)
+    if options.output:
+        options.output.write_text(json.dumps(results, indent=2))
+    if options.baseline:
+        baseline = json.loads(options.baseline.read_text())
+        regressions = compare(results, baseline, options.threshold)
+        if regressions:
+            print(f"{len(regressions)} regression(s): {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    logging.getLogger().setLevel(logging.WARNING)
+    sys.exit(main())
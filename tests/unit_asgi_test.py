@@ -0,0 +1,104 @@
+import asyncio
+import json
+import time
+
+import pytest
+
+from battle_snake import asgi
+
+
+@pytest.fixture
+def app():
+    app = asgi.BattlesnakeApp(move_workers=1, max_pending_moves=1)
+    yield app
+    app.stop()
+
+
+def call(app, method: str, path: str, data=None) -> tuple[int, bytes]:
+    body = b"" if data is None else json.dumps(data).encode()
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": method, "path": path}
+    asyncio.run(app(scope, receive, send))
+    return sent[0]["status"], sent[1]["body"]
+
+
+def test_info(app):
+    status, body = call(app, "GET", "/")
+    assert status == 200
+    assert json.loads(body)["author"] == "vopri"
+
+
+def test_unknown_route(app):
+    assert call(app, "GET", "/move")[0] == 404
+
+
+def test_invalid_json(app):
+    assert call(app, "POST", "/start", data=None)[0] == 400
+
+
+def test_start_and_end(app, test_request_move_me_3):
+    assert call(app, "POST", "/start", test_request_move_me_3) == (200, b"ok")
+    assert call(app, "POST", "/end", test_request_move_me_3) == (200, b"ok")
+
+
+def test_move(app, test_request_move_me_3):
+    status, body = call(app, "POST", "/move", test_request_move_me_3)
+    assert status == 200
+    assert json.loads(body) == {"move": "right"}
+
+
+def test_move_without_time_is_decided_on_first_turn(app, test_request_move_me_3):
+    test_request_move_me_3["game"]["timeout"] = asgi.RESPONSE_RESERVE_MS
+    status, body = call(app, "POST", "/move", test_request_move_me_3)
+    assert status == 200
+    assert json.loads(body)["move"] in {"up", "down", "left", "right"}
+
+
+def test_lifespan(app):
+    messages = iter([{"type": "lifespan.startup"}, {"type": "lifespan.shutdown"}])
+    sent = []
+
+    async def receive():
+        return next(messages)
+
+    async def send(message):
+        sent.append(message["type"])
+
+    asyncio.run(app({"type": "lifespan"}, receive, send))
+    assert sent == ["lifespan.startup.complete", "lifespan.shutdown.complete"]
+
+
+def test_first_turn_decision_does_not_block_the_event_loop(app, monkeypatch):
+    async def busy_pool(game_request, simulation_deadline):
+        await asyncio.sleep(10)
+
+    def slow_decide_move(game_request, simulation_deadline):
+        time.sleep(0.3)
+        return "up"
+
+    monkeypatch.setattr(app, "_decide_move_in_pool", busy_pool)
+    monkeypatch.setattr(asgi, "decide_move", slow_decide_move)
+    game_request = {"game": {"timeout": asgi.RESPONSE_RESERVE_MS}}
+    ticks = 0
+
+    async def tick():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    async def decide_while_ticking():
+        ticker = asyncio.create_task(tick())
+        move = await app.decide_move(game_request)
+        ticker.cancel()
+        return move
+
+    assert asyncio.run(decide_while_ticking()) == "up"
+    assert ticks > 10
@@ -1,5 +1,10 @@
+import gc
+import weakref
+from collections import Counter
+
 import pytest
 from battle_snake.entities import (
+    BitboardPossibleFutureBoard,
     Board,
     GameBoardBounderies,
     NextStep,
@@ -7,6 +12,7 @@ from battle_snake.entities import (
     PossibleFutureBoard,
     Snake,
 )
+from battle_snake.scenarios import generate_move_request
 
 
 def test_placeholder():
@@ -86,10 +92,124 @@ def test_simple_future_board_several_turns_walls():
     board = Board(GameBoardBounderies(11, 11), food=set(), snakes={snake})
     future_board = PossibleFutureBoard(board)
     future_board.next_turn()
-    assert len(future_board.get_my_survived_snakes()) == 4
+    assert future_board.count_my_survived_snakes() == 4
+    future_board.next_turn()
+    assert future_board.count_my_survived_snakes() == 10
     future_board.next_turn()
-    assert len(future_board.get_my_survived_snakes()) == 10
+    assert future_board.count_my_survived_snakes() == 26
     future_board.next_turn()
-    assert len(future_board.get_my_survived_snakes()) == 26
+    assert future_board.count_my_survived_snakes() == 66
+
+
+def test_future_board_merges_equal_variants():
+    snake = Snake([Position(0, 0)], is_me=True)
+    board = Board(GameBoardBounderies(11, 11), food=set(), snakes={snake})
+    future_board = PossibleFutureBoard(board)
+    for _ in range(4):
+        future_board.next_turn()
+    survivors = future_board.get_my_survived_snakes()
+    assert len(survivors) == 54
+    assert len({snake.state_key for snake in survivors}) == 54
+    assert max(snake.multiplicity for snake in survivors) > 1
+
+
+def test_future_board_for_some_first_steps_only(solo_board_2: Board):
+    future_board = PossibleFutureBoard(solo_board_2, my_first_steps={NextStep.DOWN})
+    all_first_steps_board = PossibleFutureBoard(solo_board_2)
+    for _ in range(3):
+        future_board.next_turn()
+        all_first_steps_board.next_turn()
+    assert {
+        snake.get_my_first_step() for snake in future_board.get_my_survived_snakes()
+    } == {NextStep.DOWN}
+    assert future_board.count_my_survived_snakes() == sum(
+        snake.multiplicity
+        for snake in all_first_steps_board.get_my_survived_snakes()
+        if snake.get_my_first_step() == NextStep.DOWN
+    )
+
+
+@pytest.mark.parametrize("engine", [PossibleFutureBoard, BitboardPossibleFutureBoard])
+def test_variants_partitioned_by_snake(engine, test_request_move_me_3):
+    future_board = engine(Board.from_dict(test_request_move_me_3))
+    for _ in range(3):
+        future_board.next_turn()
+    all_variants = future_board.possible_snakes
+    assert future_board.get_my_survived_snakes() == {
+        snake for snake in all_variants if snake.is_me
+    }
+    assert set(future_board.get_variants_of_other_snakes()) == {
+        snake for snake in all_variants if not snake.is_me
+    }
+    assert future_board.count_variants() == len(all_variants)
+
+
+def test_prune_variants_of_other_snakes(test_request_move_me_3):
+    board = Board.from_dict(test_request_move_me_3)
+    complete_board = PossibleFutureBoard(board)
+    pruned_board = PossibleFutureBoard(board, max_variants_per_snake=5)
+    for _ in range(4):
+        complete_board.next_turn()
+        pruned_board.next_turn()
+    variants_per_id = Counter(
+        snake.id for snake in pruned_board.possible_snakes if not snake.is_me
+    )
+    assert max(variants_per_id.values()) <= 5
+    assert sum(pruned_board.pruned_variants_per_turn) > 0
+    assert len(pruned_board.pruned_variants_per_turn) == 5
+    assert complete_board.pruned_variants_per_turn == []
+    assert pruned_board.count_variants() < complete_board.count_variants()
+
+
+@pytest.mark.parametrize("engine", [PossibleFutureBoard, BitboardPossibleFutureBoard])
+def test_previous_generations_are_freed(engine, test_request_move_me_3):
+    future_board = engine(Board.from_dict(test_request_move_me_3))
+    first_generation = [weakref.ref(snake) for snake in future_board.possible_snakes]
+    assert all(snake.mother is None for snake in future_board.possible_snakes)
+    future_board.next_turn()
+    future_board.next_turn()
+    gc.collect()
+    assert all(ref() is None for ref in first_generation)
+
+
+def test_keep_ancestors(test_request_move_me_3, monkeypatch):
+    monkeypatch.setattr(PossibleFutureBoard, "keep_ancestors", True)
+    future_board = PossibleFutureBoard(Board.from_dict(test_request_move_me_3))
     future_board.next_turn()
-    assert len(future_board.get_my_survived_snakes()) == 66
+    assert all(snake.mother is not None for snake in future_board.possible_snakes)
+
+
+@pytest.mark.parametrize("engine", [PossibleFutureBoard, BitboardPossibleFutureBoard])
+def test_collision_check_with_cell_index(engine, test_request_move_me_4):
+    future_board = engine(Board.from_dict(test_request_move_me_4))
+    for _ in range(3):
+        others = list(future_board.get_variants_of_other_snakes())
+        for my_snake in future_board.get_my_survived_snakes():
+            expected = any(
+                my_snake.head in other.body_without_head
+                or (my_snake.head == other.head and len(my_snake) <= len(other))
+                for other in others
+            )
+            assert (
+                future_board.does_my_snake_bite_or_collide_with_another_snake(my_snake)
+                == expected
+            )
+        future_board.next_turn()
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_deterministic_bodies_like_bitboards(seed):
+    game_request = generate_move_request(
+        size=7, snakes=4, snake_length=4, food_density=0.3, seed=seed
+    )
+    boards = [
+        engine(Board.from_dict(game_request))
+        for engine in (PossibleFutureBoard, BitboardPossibleFutureBoard)
+    ]
+    for _ in range(5):
+        objects_keys, bitboard_keys = (
+            {snake.state_key for snake in board.possible_snakes} for board in boards
+        )
+        assert objects_keys == bitboard_keys
+        for board in boards:
+            board.next_turn()
@@ -44,8 +44,7 @@ def test_future_snake_right_without_food(
         next_step=NextStep.RIGHT, is_food_available=False
     )
     assert (
-        future_snake._head_and_body
-        == snake_long_future_right_without_food._head_and_body
+        future_snake.head_and_body == snake_long_future_right_without_food.head_and_body
     )
 
 
@@ -56,8 +55,7 @@ def test_future_snake_left_without_food(
         next_step=NextStep.LEFT, is_food_available=False
     )
     assert (
-        future_snake._head_and_body
-        == snake_long_future_left_without_food._head_and_body
+        future_snake.head_and_body == snake_long_future_left_without_food.head_and_body
     )
 
 
@@ -67,9 +65,7 @@ def test_future_snake_up_without_food(
     future_snake: Snake = snake_long.calculate_future_snake(
         next_step=NextStep.UP, is_food_available=False
     )
-    assert (
-        future_snake._head_and_body == snake_long_future_up_without_food._head_and_body
-    )
+    assert future_snake.head_and_body == snake_long_future_up_without_food.head_and_body
 
 
 def test_future_snake_down_without_food(
@@ -79,8 +75,8 @@ def test_future_snake_down_without_food(
         next_step=NextStep.DOWN, is_food_available=False
     )
     assert (
-        future_snake._head_and_body
-        == snake_long_2_future_down_without_food._head_and_body
+        future_snake.head_and_body
+        == snake_long_2_future_down_without_food.head_and_body
     )
 
 
@@ -91,28 +87,28 @@ def test_future_snake_mini_without_food_growing():
     )
     assert len(future_snake) == len(baby_snake) + 1
     assert (
-        future_snake._head_and_body
+        future_snake.head_and_body
         == Snake.from_dict(
             **{"body": [{"x": 7, "y": 3}, {"x": 7, "y": 4}]}
-        )._head_and_body
+        ).head_and_body
     )
     future_snake = future_snake.calculate_future_snake(
         next_step=NextStep.DOWN, is_food_available=False
     )
     assert (
-        future_snake._head_and_body
+        future_snake.head_and_body
         == Snake.from_dict(
             **{"body": [{"x": 7, "y": 2}, {"x": 7, "y": 3}, {"x": 7, "y": 4}]}
-        )._head_and_body
+        ).head_and_body
     )
     future_snake = future_snake.calculate_future_snake(
         next_step=NextStep.DOWN, is_food_available=False
     )
     assert (
-        future_snake._head_and_body
+        future_snake.head_and_body
         == Snake.from_dict(
             **{"body": [{"x": 7, "y": 1}, {"x": 7, "y": 2}, {"x": 7, "y": 3}]}
-        )._head_and_body
+        ).head_and_body
     )
 
 
@@ -145,3 +141,111 @@ def test_future_snake_of_future_snake():
     assert future_snake.head == Position(5, 4)
     assert len(future_snake) == 4
     assert future_snake.get_my_first_step() == NextStep.DOWN
+
+
+def test_future_snake_shares_body_with_mother(snake_long: Snake):
+    future_snake = snake_long.calculate_future_snake(NextStep.RIGHT)
+    future_snake_2 = future_snake.calculate_future_snake(NextStep.UP)
+    assert future_snake_2._origin is snake_long._origin
+    assert future_snake_2._path[1] is future_snake._path
+    assert future_snake_2.head_and_body[1:] == future_snake.head_and_body[:-1]
+    assert len(future_snake_2) == len(snake_long)
+
+
+def test_snake_tail():
+    snake = Snake([Position(5, 5), Position(5, 4), Position(5, 4)])
+    assert snake.tail == Position(5, 4)
+    assert snake.is_tail_stacked()
+    future_snake = snake.calculate_future_snake(NextStep.UP)
+    assert future_snake.tail == Position(5, 4)
+    assert not future_snake.is_tail_stacked()
+    future_snake = future_snake.calculate_future_snake(NextStep.UP)
+    future_snake = future_snake.calculate_future_snake(NextStep.UP)
+    assert future_snake.head_and_body == [
+        Position(5, 8),
+        Position(5, 7),
+        Position(5, 6),
+    ]
+    assert future_snake.tail == Position(5, 6)
+
+
+def test_lean_future_snake(snake_long: Snake):
+    future_snake = snake_long.calculate_future_snake(NextStep.RIGHT, keep_mother=False)
+    future_snake_2 = future_snake.calculate_future_snake(NextStep.UP, keep_mother=False)
+    assert future_snake_2.mother is None
+    assert future_snake_2.get_my_first_step() == NextStep.RIGHT
+    assert future_snake_2.id == snake_long.id
+    assert f"MOTHER={future_snake.head}" in repr(future_snake_2)
+
+
+def test_lean_baby_snake_grows():
+    baby = Snake([Position(5, 5)])
+    future_snake = baby.calculate_future_snake(NextStep.UP, keep_mother=False)
+    future_snake = future_snake.calculate_future_snake(NextStep.UP, keep_mother=False)
+    assert len(future_snake) == 3
+    future_snake = future_snake.calculate_future_snake(NextStep.UP, keep_mother=False)
+    assert len(future_snake) == 3
+
+
+def test_future_snake_has_no_instance_dict(snake_long: Snake):
+    future_snake = snake_long.calculate_future_snake(NextStep.RIGHT)
+    assert not hasattr(snake_long, "__dict__")
+    assert not hasattr(future_snake, "__dict__")
+    with pytest.raises(AttributeError):
+        future_snake.unknown_attribute = True  # type: ignore
+
+
+@pytest.mark.parametrize("is_food_available", [False, True])
+def test_future_snake_bites_itself_by_occupancy(snake_long: Snake, is_food_available):
+    snakes = [snake_long, Snake([Position(5, 5)] * 3)]
+    for _ in range(4):
+        snakes = [
+            snake.calculate_future_snake(step, is_food_available)
+            for snake in snakes
+            for step in NextStep
+        ]
+        for snake in snakes:
+            assert snake.bites_itself() == (snake.head in snake.body_without_head)
+        snakes = [snake for snake in snakes if not snake.bites_itself()]
+
+
+def test_future_snake_may_follow_its_tail():
+    snake = Snake([Position(5, 5), Position(5, 4), Position(4, 4), Position(4, 5)])
+    assert not snake.calculate_future_snake(NextStep.LEFT).bites_itself()
+    assert snake.calculate_future_snake(NextStep.LEFT, True).bites_itself()
+
+
+def test_occupancy_is_numbered_like_the_board():
+    bounderies = GameBoardBounderies(19, 19)
+    snake = Snake([Position(15, 15), Position(15, 14), Position(15, 13)], is_me=True)
+    board = Board(bounderies, food=set(), snakes={snake})
+    assert board.my_snake._occupied == bounderies.cells_mask(snake.head_and_body)
+    future_snake = snake.calculate_future_snake(NextStep.UP)
+    assert future_snake._occupied == bounderies.cells_mask(future_snake.head_and_body)
+
+
+def test_head_in_the_wall_occupies_nothing():
+    snake = Snake([Position(0, 1), Position(0, 0), Position(1, 0)])
+    future_snake = snake.calculate_future_snake(NextStep.LEFT)
+    assert future_snake.head == Position(-1, 1)
+    assert not future_snake.bites_itself()
+    assert future_snake._occupied == GameBoardBounderies(11, 11).cells_mask(
+        [Position(0, 1), Position(0, 0)]
+    )
+
+
+def test_rebase_future_snake_on_snake_one_turn_later(snake_long: Snake):
+    variant = snake_long.calculate_future_snake(NextStep.UP).calculate_future_snake(
+        NextStep.LEFT
+    )
+    snake_after_first_step = Snake(
+        snake_long.calculate_future_snake(NextStep.UP).head_and_body
+    )
+    rebased_variant = variant.rebase_on(snake_after_first_step)
+    expected = snake_after_first_step.calculate_future_snake(NextStep.LEFT)
+    assert rebased_variant.head_and_body == expected.head_and_body
+    assert rebased_variant.state_key == expected.state_key
+    assert rebased_variant._occupied == expected._occupied
+    assert rebased_variant.get_path() == [expected.head]
+    other_snake = Snake(snake_long.calculate_future_snake(NextStep.LEFT).head_and_body)
+    assert variant.rebase_on(other_snake) is None
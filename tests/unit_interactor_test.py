@@ -1,5 +1,23 @@
+import copy
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from battle_snake import interactor
 from battle_snake.entities import NextStep, PossibleFutureBoard
-from battle_snake.interactor import FirstStep, MyFutureHistory, Tactics
+from battle_snake.interactor import (
+    TIMEOUT_RESERVE_MS,
+    UNLIMITED_TIME_BUDGET,
+    FirstStep,
+    MoveDecision,
+    MyFutureHistory,
+    SimulationCosts,
+    Tactics,
+    create_simulation_pool,
+    forget_game,
+    get_simulation_costs,
+    simulate_first_step,
+)
 
 
 def test_my_future_history_food(solo_board_2):
@@ -79,3 +97,183 @@ def test_tactis_4(solo_board_1):
         fb.next_turn()
     tactics = Tactics(hist, solo_board_1)
     assert tactics.decide() == NextStep.UP
+
+
+def test_move_decision_stops_simulation_at_deadline(test_request_move_me_3):
+    game_request = copy.deepcopy(test_request_move_me_3)
+    game_request["game"]["timeout"] = TIMEOUT_RESERVE_MS
+    md = MoveDecision(game_request)
+    assert md.decide() in NextStep
+    assert md.future_board.simulated_turns == 1
+
+
+def test_move_decision_goes_deeper_with_time_left(solo_board_request_2):
+    md = MoveDecision(
+        solo_board_request_2, time_budget=UNLIMITED_TIME_BUDGET, forecast_depth=8
+    )
+    md.decide()
+    assert md.future_board.simulated_turns == 8
+    assert md.stop_reason == interactor.STOP_DEPTH
+
+
+def test_simulation_costs():
+    costs = SimulationCosts()
+    assert costs.predict_duration(10) is None
+    costs.save(duration=1000, expanded_variants=10)
+    assert costs.predict_duration(20) == 2000
+    costs.save(duration=2000, expanded_variants=10)
+    assert 2000 < costs.predict_duration(20) < 4000
+
+
+def test_simulation_costs_kept_per_game(test_request_move_me_3):
+    game_id = test_request_move_me_3["game"]["id"]
+    MoveDecision(test_request_move_me_3).decide()
+    costs = get_simulation_costs(game_id)
+    assert costs.predict_duration(100) is not None
+    assert get_simulation_costs(game_id) is costs
+    forget_game(game_id)
+    assert get_simulation_costs(game_id) is not costs
+    forget_game(game_id)
+
+
+def test_move_decision_per_first_step_same_as_serial(solo_board_request_2):
+    serial_history = MoveDecision(
+        solo_board_request_2, time_budget=UNLIMITED_TIME_BUDGET, forecast_depth=6
+    ).simulate()
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        parallel_history = MoveDecision(
+            solo_board_request_2,
+            executor=executor,
+            time_budget=UNLIMITED_TIME_BUDGET,
+            forecast_depth=6,
+        ).simulate()
+    assert parallel_history.simulated_turns == serial_history.simulated_turns == 6
+    assert (
+        parallel_history._counter_of_snakes_alive_after_n_steps
+        == serial_history._counter_of_snakes_alive_after_n_steps
+    )
+    assert (
+        parallel_history._found_first_food_after_n_steps
+        == serial_history._found_first_food_after_n_steps
+    )
+    # Only my snake is on the board, the branches split its variants
+    assert len(parallel_history.variants_per_turn) == 6
+    assert parallel_history.variants_per_turn == serial_history.variants_per_turn
+
+
+def test_move_decision_with_simulation_pool(test_request_move_me_3):
+    assert create_simulation_pool(1) is None
+    simulation_pool = create_simulation_pool(2)
+    try:
+        # Starting the workers takes a while on a busy machine
+        md = MoveDecision(
+            test_request_move_me_3,
+            executor=simulation_pool,
+            time_budget=UNLIMITED_TIME_BUDGET,
+            forecast_depth=4,
+        )
+        assert md.decide() in NextStep
+        assert md._history.simulated_turns > 1
+    finally:
+        simulation_pool.shutdown()
+
+
+def test_move_decision_does_not_wait_for_busy_executor(test_request_move_me_3):
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        executor.submit(time.sleep, 1)
+        start = time.perf_counter()
+        md = MoveDecision(
+            test_request_move_me_3, executor=executor, time_budget=100_000_000
+        )
+        assert md.decide() in NextStep
+        assert time.perf_counter() - start < 0.5
+        assert md.stop_reason == interactor.STOP_EXECUTOR
+        assert md.simulated_turns == 1
+
+
+def test_move_decision_survives_failing_executor(test_request_move_me_3, monkeypatch):
+    def fail(*args, **kwargs):
+        raise RuntimeError("worker died")
+
+    monkeypatch.setattr(interactor, "simulate_first_step", fail)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        md = MoveDecision(test_request_move_me_3, executor=executor)
+        assert md.decide() in NextStep
+        assert md.stop_reason == interactor.STOP_EXECUTOR
+        assert md.simulated_turns == 1
+
+
+def test_simulate_first_step_stops_at_absolute_deadline(test_request_move_me_3):
+    history = simulate_first_step(
+        test_request_move_me_3,
+        NextStep.UP,
+        PossibleFutureBoard,
+        deadline=time.time() - 1,
+    )
+    assert history.simulated_turns == 1
+
+
+def test_simulation_costs_of_games_in_threads(monkeypatch):
+    monkeypatch.setattr(interactor, "MAX_REMEMBERED_GAMES", 5)
+    monkeypatch.setattr(interactor, "_simulation_costs_of_games", dict())
+    game_ids = [f"game-{index}" for index in range(200)]
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        costs = list(executor.map(get_simulation_costs, game_ids))
+    assert all(isinstance(game_costs, SimulationCosts) for game_costs in costs)
+    assert len(interactor._simulation_costs_of_games) == 5
+
+
+def make_next_request(game_request: dict, step: NextStep) -> dict:
+    """Request of the next turn, after my snake (alone, not eating) made the step."""
+    next_request = copy.deepcopy(game_request)
+    body = next_request["you"]["body"]
+    head = dict(body[0])
+    head["x"] += {NextStep.RIGHT: 1, NextStep.LEFT: -1}.get(step, 0)
+    head["y"] += {NextStep.UP: 1, NextStep.DOWN: -1}.get(step, 0)
+    assert head not in next_request["board"]["food"]
+    body = [head] + body[:-1]
+    next_request["you"].update(body=body, head=head)
+    next_request["board"]["snakes"] = [next_request["you"]]
+    next_request["turn"] += 1
+    return next_request
+
+
+def count_paths(move_decision: MoveDecision) -> Counter:
+    paths: Counter = Counter()
+    for snake in move_decision.future_board.get_my_survived_snakes():
+        paths[snake.state_key] += snake.multiplicity
+    return paths
+
+
+def test_move_decision_resumes_simulation_of_previous_move(
+    monkeypatch, solo_board_request_2
+):
+    monkeypatch.setattr(interactor, "REUSE_SIMULATION", True)
+    game_request = copy.deepcopy(solo_board_request_2)
+    game_request["game"]["id"] = "resumed-game"
+    md = MoveDecision(game_request, time_budget=UNLIMITED_TIME_BUDGET, forecast_depth=6)
+    next_request = make_next_request(game_request, md.decide())
+    resumed_md = MoveDecision(
+        next_request, time_budget=UNLIMITED_TIME_BUDGET, forecast_depth=6
+    )
+    resumed_md.simulate()
+    # The next move simulates from scratch
+    assert interactor.take_simulation("resumed-game") is None
+    new_md = MoveDecision(
+        next_request, time_budget=UNLIMITED_TIME_BUDGET, forecast_depth=6
+    )
+    new_md.simulate()
+    # Turns 2 to 4 were resumed, not simulated
+    assert resumed_md.variants_per_turn[1:4] == [0, 0, 0]
+    assert count_paths(resumed_md) == count_paths(new_md)
+    assert resumed_md.tactics.decide() == new_md.tactics.decide()
+    forget_game("resumed-game")
+
+
+def test_move_decision_keeps_no_simulation_by_default(solo_board_request_2):
+    game_request = copy.deepcopy(solo_board_request_2)
+    game_request["game"]["id"] = "not-resumed-game"
+    MoveDecision(
+        game_request, time_budget=UNLIMITED_TIME_BUDGET, forecast_depth=4
+    ).decide()
+    assert interactor.take_simulation("not-resumed-game") is None
@@ -0,0 +1,42 @@
+from battle_snake import metrics
+from battle_snake.interactor import STOP_READY, MoveDecision
+
+
+def test_counter():
+    counter = metrics.Counter("test_total", "Test.", label="reason")
+    counter.inc("a")
+    counter.inc("a")
+    counter.inc("b", 3)
+    assert counter.render() == [
+        "# HELP test_total Test.",
+        "# TYPE test_total counter",
+        'test_total{reason="a"} 2',
+        'test_total{reason="b"} 3',
+    ]
+
+
+def test_histogram():
+    histogram = metrics.Histogram("test", "Test.", (1, 10))
+    for value in (0.5, 5, 5, 50):
+        histogram.observe(value)
+    assert histogram.render() == [
+        "# HELP test Test.",
+        "# TYPE test histogram",
+        'test_bucket{le="1"} 1',
+        'test_bucket{le="10"} 3',
+        'test_bucket{le="+Inf"} 4',
+        "test_sum 60.5",
+        "test_count 4",
+    ]
+
+
+def test_observe_move(solo_board_request_1):
+    md = MoveDecision(solo_board_request_1)
+    md.decide()
+    stops_before = metrics.simulation_stops.get(STOP_READY)
+    count_before = metrics.move_duration.get_count()
+    metrics.observe_move(md, 0.1)
+    assert metrics.simulation_stops.get(STOP_READY) == stops_before + 1
+    assert metrics.move_duration.get_count() == count_before + 1
+    assert metrics.decisions.get(md.tactics.tactic) > 0
+    assert "battlesnake_simulated_turns_count" in metrics.render()
@@ -1,4 +1,13 @@
-from battle_snake.entities import PossibleFutureBoard
+import pytest
+from battle_snake.entities import (
+    BitboardPossibleFutureBoard,
+    Board,
+    FutureBoard,
+    GameBoardBounderies,
+    Position,
+    PossibleFutureBoard,
+)
+from battle_snake.interactor import MoveDecision, MyFutureHistory
 
 
 def test_future_board_init(solo_board_1):
@@ -14,3 +23,74 @@ def test_future_board_init(solo_board_1):
     fb.next_turn()
     assert fb.simulated_turns == 4
     assert len(fb.get_my_survived_snakes()) == 13
+
+
+def test_bounderies_cell_bit():
+    bounderies = GameBoardBounderies(11, 11)
+    assert bounderies.cell_bit(Position(0, 0)) == 1
+    assert bounderies.cell_bit(Position(3, 2)) == 1 << 25
+    assert bounderies.cells_mask([Position(0, 0), Position(1, 0)]) == 0b11
+
+
+def load_engine(engine_name: str) -> type[FutureBoard]:
+    if engine_name == "vectorized":
+        # NumPy is optional
+        vectorized = pytest.importorskip("battle_snake.vectorized")
+        return vectorized.VectorizedPossibleFutureBoard
+    return BitboardPossibleFutureBoard
+
+
+@pytest.mark.parametrize("engine_name", ["bitboard", "vectorized"])
+@pytest.mark.parametrize(
+    "game_request_name",
+    [
+        "sample_request",
+        "test_request",
+        "test_request_move_me_1",
+        "test_request_move_me_2",
+        "test_request_move_me_3",
+        "test_request_move_me_4",
+        "solo_board_request_2",
+        "solo_board_request_4",
+    ],
+)
+def test_engine_same_results(
+    game_request_name: str, engine_name: str, request: pytest.FixtureRequest
+):
+    game_request = request.getfixturevalue(game_request_name)
+    histories = []
+    for engine in (PossibleFutureBoard, load_engine(engine_name)):
+        history = MyFutureHistory()
+        future_board = engine(Board.from_dict(game_request))
+        future_board.register_recorder(history)
+        for _ in range(6):
+            future_board.next_turn()
+        histories.append(history)
+    objects_history, engine_history = histories
+    assert (
+        objects_history._counter_of_snakes_alive_after_n_steps
+        == engine_history._counter_of_snakes_alive_after_n_steps
+    )
+    assert (
+        objects_history._found_first_food_after_n_steps
+        == engine_history._found_first_food_after_n_steps
+    )
+    assert (
+        objects_history._dangerous_snake_first_step
+        == engine_history._dangerous_snake_first_step
+    )
+
+
+def test_vacating_turns_built_when_needed_only(test_request):
+    future_board = BitboardPossibleFutureBoard(Board.from_dict(test_request))
+    future_board.next_turn()
+    assert future_board._vacating_turns is None
+    future_board = PossibleFutureBoard(Board.from_dict(test_request))
+    assert future_board._vacating_turns is not None
+
+
+def test_move_decision_engine_selectable(test_request_move_me_3):
+    md = MoveDecision(test_request_move_me_3, future_board_engine=PossibleFutureBoard)
+    assert type(md.future_board) == PossibleFutureBoard
+    md = MoveDecision(test_request_move_me_3)
+    assert type(md.future_board) == BitboardPossibleFutureBoard
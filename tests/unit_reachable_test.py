@@ -0,0 +1,115 @@
+import pytest
+
+from battle_snake import interactor
+from battle_snake.entities import Board, NextStep, Position
+from battle_snake.interactor import MoveDecision
+from battle_snake.reachable import (
+    calculate_reachable_area,
+    calculate_reachable_areas,
+    get_vacating_turns,
+)
+
+
+def make_request(*bodies: list[tuple[int, int]], size: int = 7) -> dict:
+    snakes = [
+        {
+            "id": f"snake-{index}",
+            "body": [{"x": x, "y": y} for x, y in body],
+            "head": {"x": body[0][0], "y": body[0][1]},
+        }
+        for index, body in enumerate(bodies)
+    ]
+    return {
+        "game": {"id": "reachable", "timeout": 500},
+        "board": {"height": size, "width": size, "food": [], "snakes": snakes},
+        "you": snakes[0],
+    }
+
+
+# My snake next to a pocket of 3 cells on the left (x=0, y=0..2)
+DEAD_END_ON_THE_LEFT = [
+    (1, 0),
+    (1, 1),
+    (1, 2),
+    (1, 3),
+    (0, 3),
+    (0, 4),
+    (0, 5),
+    (0, 6),
+    (1, 6),
+    (2, 6),
+]
+
+
+def test_vacating_turns():
+    board = Board.from_dict(make_request([(1, 1), (1, 0), (0, 0), (0, 0)]))
+    vacating_turns = get_vacating_turns(board)
+    assert vacating_turns[board.bounderies.cell_index(Position(1, 1))] == 4
+    assert vacating_turns[board.bounderies.cell_index(Position(1, 0))] == 3
+    assert vacating_turns[board.bounderies.cell_index(Position(0, 0))] == 2
+    assert vacating_turns[board.bounderies.cell_index(Position(3, 3))] == 0
+
+
+def test_whole_board_is_reachable():
+    board = Board.from_dict(make_request([(3, 3), (3, 2), (3, 1)]))
+    assert calculate_reachable_area(board, Position(3, 4)) == 49
+
+
+def test_reachable_area_with_limit():
+    board = Board.from_dict(make_request([(3, 3), (3, 2), (3, 1)]))
+    assert calculate_reachable_area(board, Position(3, 4), limit=10) == 10
+
+
+def test_occupied_start():
+    board = Board.from_dict(make_request([(3, 3), (3, 2), (3, 1)]))
+    assert calculate_reachable_area(board, Position(3, 2)) == 0
+    assert calculate_reachable_area(board, Position(7, 2)) == 0
+
+
+def test_reachable_areas_of_first_steps():
+    board = Board.from_dict(make_request(DEAD_END_ON_THE_LEFT))
+    areas = calculate_reachable_areas(board)
+    assert areas[NextStep.LEFT] == 3
+    assert areas[NextStep.RIGHT] == 49
+    assert areas[NextStep.UP] == areas[NextStep.DOWN] == 0
+
+
+def test_vacated_tail_is_reachable():
+    # The pocket is closed by the end of the tail, that's free soon enough
+    board = Board.from_dict(make_request([(1, 0), (1, 1), (0, 1)]))
+    assert calculate_reachable_area(board, Position(0, 0)) == 49
+
+
+def test_move_decision_skips_dead_ends(monkeypatch):
+    monkeypatch.setattr(interactor, "SKIP_DEAD_ENDS", True)
+    md = MoveDecision(make_request(DEAD_END_ON_THE_LEFT))
+    assert md.decide() == NextStep.RIGHT
+    assert md.variants_per_turn[0] == 1
+    # The single step into enough room is simulated anyway
+    assert md.simulated_turns > 1
+
+
+def test_move_decision_does_not_skip_dead_ends_by_default():
+    md = MoveDecision(make_request(DEAD_END_ON_THE_LEFT))
+    assert md.decide() == NextStep.RIGHT
+    assert md.variants_per_turn[0] == 2
+
+
+def test_move_decision_simulates_dead_ends_if_no_step_into_room_survives(
+    monkeypatch,
+):
+    monkeypatch.setattr(interactor, "SKIP_DEAD_ENDS", True)
+    # Pretend the step into the wall leads into enough room
+    monkeypatch.setattr(
+        interactor,
+        "calculate_reachable_areas",
+        lambda board: {
+            NextStep.UP: 0,
+            NextStep.DOWN: 49,
+            NextStep.LEFT: 3,
+            NextStep.RIGHT: 3,
+        },
+    )
+    md = MoveDecision(make_request(DEAD_END_ON_THE_LEFT))
+    assert md.decide() in (NextStep.LEFT, NextStep.RIGHT)
+    assert md.variants_per_turn[0] == 2
@@ -0,0 +1,81 @@
+import copy
+import threading
+
+from battle_snake import recording
+from battle_snake.interactor import MoveDecision
+from battle_snake.recording import (
+    GameRecorder,
+    find_record_files,
+    main,
+    read_records,
+    replay_game,
+)
+
+
+def record_game(recorder: GameRecorder, game_request: dict):
+    recorder.record_start(game_request)
+    for turn in range(2):
+        move_request = copy.deepcopy(game_request)
+        move_request["turn"] = turn
+        md = MoveDecision(move_request)
+        move = md.decide().value
+        recorder.record_move(move_request, md, move, 0.05)
+    recorder.record_end(game_request)
+
+
+def test_record_game(tmp_path, test_request_move_me_3):
+    recorder = GameRecorder(tmp_path)
+    record_game(recorder, test_request_move_me_3)
+    path = recorder.get_path(test_request_move_me_3["game"]["id"])
+    records = list(read_records(path))
+    assert [record["event"] for record in records] == ["start", "move", "move", "end"]
+    assert records[1]["request"] == {**test_request_move_me_3, "turn": 0}
+    assert records[1]["move"] == "right"
+    assert records[1]["simulated_turns"] >= 1
+    assert records[1]["duration_ms"] == 50
+    assert find_record_files([tmp_path]) == [path]
+
+
+def test_replay_same_decisions(tmp_path, test_request_move_me_3):
+    recorder = GameRecorder(tmp_path)
+    record_game(recorder, test_request_move_me_3)
+    path = recorder.get_path(test_request_move_me_3["game"]["id"])
+    replayed = replay_game(path)
+    assert [move.turn for move in replayed] == [0, 1]
+    assert not any(move.is_different for move in replayed)
+    assert main([str(tmp_path)]) == 0
+
+
+def test_game_id_is_a_safe_file_name(tmp_path):
+    path = GameRecorder(tmp_path).get_path("../game 1")
+    assert path.parent == tmp_path
+
+
+def test_records_are_written_in_the_background(
+    tmp_path, monkeypatch, test_request_move_me_3
+):
+    disk_available = threading.Event()
+    gzip_open = recording.gzip.open
+
+    def slow_gzip_open(*args, **kwargs):
+        assert disk_available.wait(timeout=5)
+        return gzip_open(*args, **kwargs)
+
+    monkeypatch.setattr(recording.gzip, "open", slow_gzip_open)
+    recorder = GameRecorder(tmp_path)
+    recorder.record_start(test_request_move_me_3)
+    path = recorder.get_path(test_request_move_me_3["game"]["id"])
+    assert not path.exists()
+    disk_available.set()
+    recorder.flush()
+    assert [record["event"] for record in read_records(path)] == ["start"]
+    recorder.close()
+
+
+def test_close_writes_pending_records(tmp_path, test_request_move_me_3):
+    recorder = GameRecorder(tmp_path)
+    for _ in range(3):
+        recorder.record_start(test_request_move_me_3)
+    recorder.close()
+    path = recorder.get_path(test_request_move_me_3["game"]["id"])
+    assert len(list(read_records(path))) == 3
@@ -0,0 +1,139 @@
+import socket
+
+from battle_snake import referee
+from battle_snake.entities import NextStep, Position
+from battle_snake.referee import (
+    BODY_COLLISION,
+    HEAD_COLLISION,
+    MAX_HEALTH,
+    OUT_OF_BOUNDS,
+    OUT_OF_HEALTH,
+    Game,
+    GameResult,
+    HttpPlayer,
+    SnakeState,
+    play_game,
+    play_games,
+    summarize,
+)
+
+
+class ScriptedPlayer:
+    def __init__(self, step: NextStep = NextStep.UP):
+        self.step = step
+
+    def start(self, game_request: dict):
+        pass
+
+    def move(self, game_request: dict) -> NextStep:
+        return self.step
+
+    def end(self, game_request: dict):
+        pass
+
+
+def make_game(*bodies: list[tuple[int, int]], food=()) -> Game:
+    game = Game([ScriptedPlayer() for _ in bodies], size=7)
+    game.snakes = [
+        SnakeState(f"snake-{index}", [Position(x, y) for x, y in body])
+        for index, body in enumerate(bodies)
+    ]
+    game.food = {Position(x, y) for x, y in food}
+    return game
+
+
+def test_move_and_eat():
+    game = make_game([(1, 1), (1, 0), (0, 0)], food=[(1, 2)])
+    game.apply_moves({"snake-0": NextStep.UP})
+    snake = game.snakes[0]
+    assert snake.body == [
+        Position(1, 2),
+        Position(1, 1),
+        Position(1, 0),
+        Position(1, 0),
+    ]
+    assert snake.health == MAX_HEALTH
+    assert Position(1, 2) not in game.food
+    assert game.turn == 1
+
+
+def test_move_without_food():
+    game = make_game([(1, 1), (1, 0), (0, 0)], food=[(6, 6)])
+    game.apply_moves({"snake-0": NextStep.RIGHT})
+    assert game.snakes[0].body == [Position(2, 1), Position(1, 1), Position(1, 0)]
+    assert game.snakes[0].health == MAX_HEALTH - 1
+
+
+def test_out_of_bounds():
+    game = make_game([(0, 1), (1, 1), (2, 1)], food=[(6, 6)])
+    game.apply_moves({"snake-0": NextStep.LEFT})
+    assert game.snakes[0].eliminated_by == OUT_OF_BOUNDS
+
+
+def test_out_of_health():
+    game = make_game([(3, 3), (3, 2), (3, 1)], food=[(6, 6)])
+    game.snakes[0].health = 1
+    game.apply_moves({"snake-0": NextStep.UP})
+    assert game.snakes[0].eliminated_by == OUT_OF_HEALTH
+
+
+def test_head_to_head_shorter_loses():
+    game = make_game(
+        [(2, 3), (1, 3), (0, 3)], [(4, 3), (5, 3), (6, 3), (6, 4)], food=[(0, 0)]
+    )
+    game.apply_moves({"snake-0": NextStep.RIGHT, "snake-1": NextStep.LEFT})
+    assert game.snakes[0].eliminated_by == HEAD_COLLISION
+    assert game.snakes[1].eliminated_by is None
+    assert game.is_over()
+
+
+def test_head_to_head_same_length_both_lose():
+    game = make_game([(2, 3), (1, 3), (0, 3)], [(4, 3), (5, 3), (6, 3)], food=[(0, 0)])
+    game.apply_moves({"snake-0": NextStep.RIGHT, "snake-1": NextStep.LEFT})
+    assert game.snakes[0].eliminated_by == HEAD_COLLISION
+    assert game.snakes[1].eliminated_by == HEAD_COLLISION
+
+
+def test_body_collision():
+    game = make_game([(2, 2), (1, 2), (0, 2)], [(3, 4), (3, 3), (3, 2), (3, 1)])
+    game.apply_moves({"snake-0": NextStep.RIGHT, "snake-1": NextStep.UP})
+    assert game.snakes[0].eliminated_by == BODY_COLLISION
+    assert game.snakes[1].eliminated_by is None
+
+
+def test_make_request_is_seen_from_the_snake():
+    game = make_game([(2, 2), (1, 2), (0, 2)], [(3, 4), (3, 3), (3, 2)])
+    game_request = game.make_request(game.snakes[1])
+    assert game_request["you"]["id"] == "snake-1"
+    assert len(game_request["board"]["snakes"]) == 2
+    assert game_request["board"]["width"] == 7
+
+
+def test_play_game_in_process():
+    result = play_game(seed=1, snakes=2, size=7, timeout=200, max_turns=10)
+    assert 0 < result.turns <= 10
+    assert len(result.latencies) >= result.turns
+
+
+def test_play_games_in_parallel():
+    results, duration = play_games(
+        2, workers=2, snakes=2, size=7, timeout=200, max_turns=3
+    )
+    summary = summarize(results, duration)
+    assert summary["games"] == 2
+    assert summary["turns"] == sum(result.turns for result in results)
+    assert summary["turns_per_second"] > 0
+
+
+def test_hanging_server_is_a_timeout(monkeypatch):
+    monkeypatch.setattr(referee, "HTTP_TIMEOUT_SLACK", 0.1)
+    with socket.create_server(("127.0.0.1", 0)) as hanging_server:
+        port = hanging_server.getsockname()[1]
+        game = make_game([(2, 2), (1, 2), (0, 2)])
+        game.timeout = 100
+        game.snakes[0].last_move = NextStep.RIGHT
+        result = GameResult(0, None, dict())
+        player = HttpPlayer(f"http://127.0.0.1:{port}")
+        move = game._ask_for_move(player, game.snakes[0], result)
+    assert move == NextStep.RIGHT
+    assert result.timeouts == 1
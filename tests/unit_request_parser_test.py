@@ -0,0 +1,39 @@
+import copy
+import json
+from pathlib import Path
+
+import pytest
+
+from battle_snake.entities import Board, Position
+from battle_snake.request_parser import parse_board, parse_move_request
+
+REQUEST_FILES = sorted(Path(__file__).parent.glob("*.json"))
+
+
+def snakes_of(board: Board) -> set[tuple]:
+    return {(tuple(snake.head_and_body), snake.is_me) for snake in board.snakes}
+
+
+@pytest.mark.parametrize("request_file", REQUEST_FILES, ids=lambda path: path.stem)
+def test_same_board_as_from_dict(request_file: Path):
+    raw_request = request_file.read_bytes()
+    game_request, board = parse_move_request(raw_request)
+    expected = Board.from_dict(json.loads(raw_request))
+    assert game_request == json.loads(raw_request)
+    assert board.bounderies == expected.bounderies
+    assert board.food == expected.food
+    assert snakes_of(board) == snakes_of(expected)
+    assert board.my_snake.head_and_body == expected.my_snake.head_and_body
+
+
+def test_positions_are_canonical(sample_request):
+    board = parse_board(sample_request)
+    move_table = board.bounderies.move_table
+    for pos in board.my_snake.head_and_body:
+        assert pos is move_table.get_position(pos.x, pos.y)
+
+
+def test_position_off_board(sample_request):
+    game_request = copy.deepcopy(sample_request)
+    game_request["board"]["food"].append({"x": -1, "y": 3})
+    assert Position(-1, 3) in parse_board(game_request).food
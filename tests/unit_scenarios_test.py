@@ -0,0 +1,53 @@
+import pytest
+
+from battle_snake.entities import Board
+from battle_snake.interactor import MoveDecision
+from battle_snake.scenarios import generate_move_request, generate_scenarios
+
+
+def cells_of(snake_data: dict) -> list[tuple[int, int]]:
+    return [(point["x"], point["y"]) for point in snake_data["body"]]
+
+
+@pytest.mark.parametrize("size, snakes, length", [(7, 1, 3), (11, 4, 8), (25, 8, 30)])
+def test_generated_request_is_valid(size, snakes, length):
+    game_request = generate_move_request(size, snakes, length, seed=3)
+    board_data = game_request["board"]
+    assert len(board_data["snakes"]) == snakes
+    all_cells = []
+    for snake_data in board_data["snakes"]:
+        cells = cells_of(snake_data)
+        assert len(cells) == length
+        assert snake_data["head"] == snake_data["body"][0]
+        for (x1, y1), (x2, y2) in zip(cells, cells[1:]):
+            assert abs(x1 - x2) + abs(y1 - y2) == 1
+        all_cells.extend(cells)
+    assert len(set(all_cells)) == len(all_cells)
+    assert all(0 <= x < size and 0 <= y < size for x, y in all_cells)
+    food = {(point["x"], point["y"]) for point in board_data["food"]}
+    assert food and not food & set(all_cells)
+    assert Board.from_dict(game_request).my_snake.head_and_body[0].x == all_cells[0][0]
+
+
+def test_same_seed_same_request():
+    assert generate_move_request(19, 8, seed=7) == generate_move_request(19, 8, seed=7)
+    assert generate_move_request(19, 8, seed=7) != generate_move_request(19, 8, seed=8)
+
+
+def test_food_density():
+    game_request = generate_move_request(11, 1, 5, food_density=0.1)
+    assert len(game_request["board"]["food"]) == round(0.1 * (121 - 5))
+
+
+def test_snakes_dont_fit():
+    with pytest.raises(ValueError):
+        generate_move_request(7, 8, 10)
+
+
+def test_scenarios_that_dont_fit_are_skipped():
+    scenarios = generate_scenarios(sizes=(7, 11), snake_counts=(8,), snake_lengths=(8,))
+    assert list(scenarios) == ["11x11_8_snakes_8_long_5pct_food"]
+
+
+def test_move_decision_on_generated_request():
+    MoveDecision(generate_move_request(25, 8, 10, seed=1)).decide()
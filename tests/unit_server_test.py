@@ -0,0 +1,53 @@
+import pytest
+
+pytest.importorskip("flask")
+
+from battle_snake import interactor, server
+
+
+@pytest.fixture
+def client():
+    return server.app.test_client()
+
+
+def test_info(client):
+    assert client.get("/").get_json()["author"] == "vopri"
+
+
+def test_move(client, test_request_move_me_3):
+    response = client.post("/move", json=test_request_move_me_3)
+    assert response.get_json() == {"move": "right"}
+
+
+def test_end_forgets_game(client, test_request_move_me_3):
+    game_id = test_request_move_me_3["game"]["id"]
+    client.post("/move", json=test_request_move_me_3)
+    assert game_id in interactor._simulation_costs_of_games
+    assert client.post("/end", json=test_request_move_me_3).data == b"ok"
+    assert game_id not in interactor._simulation_costs_of_games
+
+
+def test_warm_up():
+    server.warm_up()
+    assert "warm-up" not in interactor._simulation_costs_of_games
+
+
+def test_metrics(client, test_request_move_me_3):
+    client.post("/move", json=test_request_move_me_3)
+    response = client.get("/metrics")
+    assert response.content_type.startswith("text/plain")
+    text = response.get_data(as_text=True)
+    assert "battlesnake_move_duration_seconds_count" in text
+    assert 'battlesnake_variants_bucket{turn="1",le="+Inf"}' in text
+    assert "battlesnake_decisions_total{tactic=" in text
+
+
+def test_game_recording(client, test_request_move_me_3, tmp_path, monkeypatch):
+    from battle_snake.recording import GameRecorder, read_records
+
+    recorder = GameRecorder(tmp_path)
+    monkeypatch.setattr(server, "game_recorder", recorder)
+    for path in ("/start", "/move", "/end"):
+        client.post(path, json=test_request_move_me_3)
+    records = read_records(recorder.get_path(test_request_move_me_3["game"]["id"]))
+    assert [record["event"] for record in records] == ["start", "move", "end"]
@@ -2,12 +2,14 @@ from turtle import down
 
 import pytest
 from battle_snake.entities import (
+    OFF_BOARD,
     Board,
     GameBoardBounderies,
     NextStep,
     Position,
     PossibleFutureBoard,
     Snake,
+    get_move_table,
 )
 
 
@@ -158,3 +160,52 @@ def test_board_move_snake(solo_board_2: Board):
     assert solo_board_2.move_snake(solo_board_2.my_snake, NextStep.RIGHT) == Position(
         6, 8
     )
+
+
+def test_board_move_snake_into_wall():
+    snake = Snake([Position(0, 10)], is_me=True)
+    board = Board(GameBoardBounderies(11, 11), food=set(), snakes={snake})
+    assert board.move_snake(snake, NextStep.UP) == Position(0, 11)
+    assert board.move_snake(snake, NextStep.LEFT) == Position(-1, 10)
+
+
+def test_move_table():
+    move_table = get_move_table(7, 5)
+    assert move_table is GameBoardBounderies(5, 7).move_table
+    assert move_table.positions[8] == Position(1, 1)
+    assert move_table.neighbors[8] == {
+        NextStep.UP: 15,
+        NextStep.DOWN: 1,
+        NextStep.LEFT: 7,
+        NextStep.RIGHT: 9,
+    }
+    assert move_table.neighbors[0][NextStep.LEFT] == OFF_BOARD
+    assert move_table.neighbors[34][NextStep.UP] == OFF_BOARD
+    assert [move.step for move in move_table.moves[34]] == [
+        NextStep.DOWN,
+        NextStep.LEFT,
+    ]
+
+
+def test_bounderies_get_moves():
+    bounderies = GameBoardBounderies(11, 11)
+    assert {move.position for move in bounderies.get_moves(Position(0, 0))} == {
+        Position(0, 1),
+        Position(1, 0),
+    }
+    assert bounderies.get_moves(Position(-1, 0)) == ()
+
+
+def test_board_from_dict_uses_canonical_positions(sample_board: Board):
+    positions = sample_board.bounderies.move_table.positions
+    bounderies = sample_board.bounderies
+    for snake in sample_board.snakes:
+        for pos in snake.head_and_body:
+            assert pos is positions[bounderies.cell_index(pos)]
+    for food in sample_board.food:
+        assert food is positions[bounderies.cell_index(food)]
+    future_snake = sample_board.my_snake.calculate_future_snake(
+        NextStep.UP, future_head=bounderies.get_position(5, 8)
+    )
+    assert future_snake.head is bounderies.get_position(5, 8)
+    assert bounderies.get_position(11, 3) == Position(11, 3)
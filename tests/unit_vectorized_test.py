@@ -0,0 +1,133 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from battle_snake.entities import (
+    BitboardPossibleFutureBoard,
+    Board,
+    FutureBoard,
+    GameBoardBounderies,
+    NextStep,
+    Position,
+    PossibleFutureBoard,
+    Snake,
+)
+from battle_snake.interactor import MoveDecision, MyFutureHistory
+from battle_snake.vectorized import VectorizedPossibleFutureBoard
+
+
+def test_vectorized_future_board_several_turns_walls():
+    snake = Snake([Position(0, 0)], is_me=True)
+    board = Board(GameBoardBounderies(11, 11), food=set(), snakes={snake})
+    future_board = VectorizedPossibleFutureBoard(board)
+    assert future_board.count_my_survived_snakes() == 2
+    for expected_survivors in (4, 10, 26, 66):
+        future_board.next_turn()
+        assert future_board.count_my_survived_snakes() == expected_survivors
+    assert len(future_board.get_my_survived_snakes()) == 54
+
+
+def test_vectorized_future_board_food(test_board: Board):
+    future_board = VectorizedPossibleFutureBoard(test_board)
+    assert future_board.food == test_board.food
+    assert future_board.count_variants() == 14
+
+
+def test_vectorized_future_board_shares_interface_only(test_board: Board):
+    future_board = VectorizedPossibleFutureBoard(test_board)
+    assert isinstance(future_board, FutureBoard)
+    assert not isinstance(future_board, PossibleFutureBoard)
+    assert not future_board.can_resume
+    with pytest.raises(NotImplementedError):
+        future_board.resume([], 2)
+
+
+@pytest.mark.parametrize(
+    "game_request_name", ["test_request", "test_request_move_me_3"]
+)
+def test_all_engines_prune_the_same_variants(
+    game_request_name: str, request: pytest.FixtureRequest
+):
+    game_request = request.getfixturevalue(game_request_name)
+    results = []
+    for engine in (
+        PossibleFutureBoard,
+        BitboardPossibleFutureBoard,
+        VectorizedPossibleFutureBoard,
+    ):
+        history = MyFutureHistory()
+        future_board = engine(Board.from_dict(game_request), None, 5)
+        future_board.register_recorder(history)
+        for _ in range(5):
+            future_board.next_turn()
+        results.append(
+            (
+                history._counter_of_snakes_alive_after_n_steps,
+                future_board.pruned_variants_per_turn,
+                future_board.count_variants(),
+            )
+        )
+    assert results[0] == results[1] == results[2]
+    assert sum(results[0][1]) > 0
+
+
+def test_vectorized_move_decision(test_request_move_me_3):
+    md = MoveDecision(
+        test_request_move_me_3, future_board_engine=VectorizedPossibleFutureBoard
+    )
+    assert md.decide() == NextStep.RIGHT
+
+
+def test_vectorized_future_board_for_some_first_steps_only(solo_board_2: Board):
+    future_board = VectorizedPossibleFutureBoard(
+        solo_board_2, my_first_steps={NextStep.DOWN, NextStep.LEFT}
+    )
+    future_board.next_turn()
+    assert {
+        snake.get_my_first_step() for snake in future_board.get_my_survived_snakes()
+    } == {NextStep.DOWN, NextStep.LEFT}
+
+
+def summarize_variants(variants) -> set[tuple]:
+    return {
+        (snake.id, snake.head, len(snake), snake.multiplicity, snake.is_me)
+        for snake in variants
+    }
+
+
+def test_vectorized_engine_has_the_public_surface_of_the_base(
+    test_request_move_me_3,
+):
+    board = Board.from_dict(test_request_move_me_3)
+    reference_board = PossibleFutureBoard(board)
+    future_board = VectorizedPossibleFutureBoard(board)
+    recorder = MyFutureHistory()
+    future_board.register_recorder(recorder)
+    for _ in range(3):
+        for engine in (reference_board, future_board):
+            engine.next_turn()
+        assert summarize_variants(future_board.possible_snakes) == summarize_variants(
+            reference_board.possible_snakes
+        )
+        assert summarize_variants(
+            future_board.get_variants_of_other_snakes()
+        ) == summarize_variants(reference_board.get_variants_of_other_snakes())
+        assert summarize_variants(
+            future_board.get_my_survived_snakes()
+        ) == summarize_variants(reference_board.get_my_survived_snakes())
+        assert (
+            future_board.count_my_survived_snakes()
+            == reference_board.count_my_survived_snakes()
+        )
+        assert future_board.count_variants() == reference_board.count_variants()
+        assert future_board.food == reference_board.food
+        for snake in reference_board.get_my_survived_snakes():
+            assert future_board.is_food_available_for(
+                snake
+            ) == reference_board.is_food_available_for(snake)
+            assert future_board.does_my_snake_bite_or_collide_with_another_snake(
+                snake
+            ) == reference_board.does_my_snake_bite_or_collide_with_another_snake(snake)
+    assert future_board.is_wall(Position(-1, 0))
+    assert not future_board.is_wall(Position(0, 0))
+    assert recorder.simulated_turns == future_board.simulated_turns == 4